@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 import socket
+import selectors
 import threading
+from _thread import allocate_lock
+import heapq
+import itertools
 import time
 import json
 import signal
@@ -8,12 +12,12 @@ import sys
 import os
 import random
 import shutil
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from PIL import Image, ImageTk
 import tkinter as tk
 import traceback  # For better error reporting
-import queue
-import binascii  # For printing hex values of serial data
 
 # Conditionally import serial - don't break if not available
 try:
@@ -24,59 +28,137 @@ except ImportError:
     SERIAL_AVAILABLE = False
     print("PySerial not installed. Serial keyboard detection disabled.")
 
+# Use orjson for the message path if available - it parses bytes directly
+# and encodes straight to bytes. Both helpers work on bytes either way
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+
+    def json_loads(data):
+        return json.loads(bytes(data))
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+# pybase64 decodes with SIMD kernels and is a drop-in for the base64 module
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
+# Size of the reusable socket receive buffer (grows for larger messages)
+RECV_BUFFER_SIZE = 65536
+
+# Playback state. AdClient replaces it as a whole, so a reader that takes
+# one reference (s = self._state) sees a consistent state without the lock.
+# cycle_len (ad_duration * len(ads)) is kept up to date by _update_state
+_State = namedtuple("_State", "ads index start_time is_playing ad_duration cycle_len")
+
+
+def _state_property(field):
+    """AdClient attribute that lives in the immutable playback state"""
+
+    def get(self):
+        return getattr(self._state, field)
+
+    def set(self, value):
+        self._update_state(**{field: value})
+
+    return property(get, set)
+
+
+# Message terminator, sent as its own buffer next to each payload
+NEWLINE = b"\n"
+# Most buffers handed to a single sendmsg() call (IOV_MAX is 1024 on Linux)
+SENDMSG_MAX_BUFFERS = 1024
+
+# Local control commands, shown at startup and for "?"
+_HELP_TEXT = """\
+  p - Toggle Play/Pause locally
+  s - Force sync with server
+  i - Show idle/connection status
+  k - Test close window (debug)
+  w - Show window info (debug)
+  q - Quit client
+  ? - Show this help"""
+
+# get_file request with holes for the JSON-encoded filename and client id
+# ("raw": the file may come as raw bytes after the header instead of base64)
+GET_FILE_REQUEST = (
+    b'{"command": "get_file", "filename": %s, "client_id": %s, "raw": true}'
+)
+
+
+def send_frames(sock, payloads):
+    """Send newline-terminated messages with scatter-gather writes
+
+    Each payload and its terminator go out as separate buffers of the same
+    sendmsg() call, so nothing is concatenated and a batch of messages
+    costs one syscall.
+    """
+    buffers = []
+    for payload in payloads:
+        buffers.append(payload)
+        buffers.append(NEWLINE)
+
+    if not hasattr(sock, "sendmsg"):
+        # No sendmsg() on this platform (Windows)
+        sock.sendall(b"".join(buffers))
+        return
+
+    for i in range(0, len(buffers), SENDMSG_MAX_BUFFERS):
+        chunk = buffers[i : i + SENDMSG_MAX_BUFFERS]
+        sent = sock.sendmsg(chunk)
+        if sent < sum(map(len, chunk)):
+            # Partial write (socket buffer full) - send the rest normally
+            sock.sendall(b"".join(chunk)[sent:])
+
 # Global variables
-# Queue for GUI operations to be performed in the main thread
-gui_queue = queue.Queue()
 # Flag to indicate if GUI thread is running
 gui_thread_running = False
 # Tkinter root
 root = None
+# Screen (width, height), read once on the GUI thread
+screen_size = None
 # Image window references (to track all windows)
 windows = []
 # Main image window
 image_window = None
 image_label = None
+# Newest pending GUI operation per category: category -> (token, func)
+gui_pending = {}
+gui_pending_lock = threading.Lock()
+gui_tokens = itertools.count()
 
 
 def setup_gui_thread():
     """Set up the GUI thread that will handle all Tkinter operations"""
     global gui_thread_running, root
 
+    def mark_running():
+        global gui_thread_running
+        # Only report the thread as running once mainloop is dispatching events,
+        # so calls from other threads are never made before Tk can service them
+        gui_thread_running = True
+        print("GUI thread started, Tkinter main loop running")
+
     def run_gui():
-        global gui_thread_running, root
+        global gui_thread_running, root, screen_size
         try:
             # Create the main root window (invisible)
             root = tk.Tk()
+            screen_size = (root.winfo_screenwidth(), root.winfo_screenheight())
             # fullscreen
             root.attributes("-fullscreen", True)
             root.withdraw()
 
-            # Set a flag that the GUI thread is running
-            gui_thread_running = True
-            print("GUI thread started, Tkinter main loop running")
-
-            # Main loop to process GUI operations from the queue
-            while True:
-                try:
-                    # Check if there are any operations in the queue
-                    # (timeout to allow checking the root.quit flag)
-                    operation = gui_queue.get(timeout=0.1)
-                    if operation is None:
-                        # None is our signal to stop
-                        break
-                    # Execute the operation in the GUI thread
-                    operation()
-                    gui_queue.task_done()
-                except queue.Empty:
-                    # No operations, just update the UI
-                    root.update()
-                except Exception as e:
-                    print(f"Error in GUI thread: {e}")
-                    traceback.print_exc()
-
-                # Check if we should exit
-                if not gui_thread_running:
-                    break
+            # Work from other threads is injected with root.after(), so the
+            # plain Tk main loop is all we need - no polling
+            root.after(0, mark_running)
+            root.mainloop()
 
             print("GUI thread shutting down")
             root.destroy()
@@ -100,63 +182,204 @@ def setup_gui_thread():
 setup_gui_thread()
 
 
-def execute_in_gui_thread(func):
-    """Execute a function in the GUI thread"""
-    global gui_queue, gui_thread_running
+def execute_in_gui_thread(func, category=None):
+    """Execute a function in the GUI thread, keeping only the newest per category"""
+    global gui_thread_running
 
     if not gui_thread_running:
         print("GUI thread is not running, trying to restart it")
         setup_gui_thread()
 
-    # Put the function in the queue for the GUI thread to execute
-    gui_queue.put(func)
+    if root is None or not gui_thread_running:
+        print("GUI thread is not available, dropping GUI operation")
+        return
+
+    def run(operation):
+        try:
+            operation()
+        except Exception as e:
+            print(f"Error in GUI thread: {e}")
+            traceback.print_exc()
+
+    if category is None:
+        run_operation = lambda: run(func)
+    else:
+        # A newer operation of the same category replaces this one, so a
+        # stalled GUI thread only ever holds the latest (e.g. the newest ad
+        # image) instead of a backlog of stale closures and their images
+        token = next(gui_tokens)
+        with gui_pending_lock:
+            gui_pending[category] = (token, func)
+
+        def run_operation():
+            with gui_pending_lock:
+                entry = gui_pending.get(category)
+                if entry is None or entry[0] != token:
+                    return  # Superseded
+                del gui_pending[category]
+            run(entry[1])
+
+    # Tcl's event queue is thread-safe for after(), so this hands the function
+    # straight to the Tk main loop
+    try:
+        root.after(0, run_operation)
+    except (RuntimeError, tk.TclError) as e:
+        # The main loop has already exited (e.g. during shutdown)
+        print(f"GUI thread is not available, dropping GUI operation: {e}")
+
+
+def stop_gui_thread():
+    """Ask the GUI thread to leave its main loop"""
+    global gui_thread_running
+
+    if root is not None and gui_thread_running:
+        gui_thread_running = False
+        root.after(0, root.quit)
 
 
 class AdClient:
+    # Playback state attributes (see _State)
+    ads = _state_property("ads")
+    current_ad_index = _state_property("index")
+    start_time = _state_property("start_time")
+    is_playing = _state_property("is_playing")
+    ad_duration = _state_property("ad_duration")
+
     def __init__(
         self, server_host="localhost", server_port=5000, client_id=None, idle_timeout=0
     ):
         self.server_host = server_host
         self.server_port = server_port
         self.client_id = client_id or f"client_{random.randint(1000, 9999)}"
+
+        # Requests that never change for this client, encoded once
+        self._req_sync = json_dumps({"command": "get_sync", "client_id": self.client_id})
+        self._req_ads = json_dumps({"command": "get_ads", "client_id": self.client_id})
+        self._client_id_json = json_dumps(self.client_id)
         self.socket = None
         self.connected = False
         self.reconnect_interval = 5  # seconds
-
-        # Ad data
-        self.ads = []
-        self.current_ad_index = 0
-        self.ad_duration = 10  # seconds
-
-        # Local timing system
-        self.is_playing = False
+        self.connect_timeout = 10  # seconds for name lookup and TCP handshake
+        self._connecting = False  # A connection attempt is in progress
+
+        # Reusable receive buffer - messages are framed in place and only
+        # complete ones are decoded
+        self._rxbuf = bytearray(RECV_BUFFER_SIZE)
+        self._rxview = memoryview(self._rxbuf)
+        self._rxlen = 0  # Bytes currently held in the buffer
+        self._rxscan = 0  # Offset up to which the buffer has been searched for newlines
+        self._rx_file = None  # Raw file payload currently being received
+
+        # Ad data and local timing system - all local times are
+        # time.monotonic() values so wall-clock (NTP) adjustments never skip or
+        # repeat an ad. start_time is the local time when the current ad
+        # sequence started, ad_duration is in seconds
+        self._state = _State(
+            ads=[],
+            index=0,
+            start_time=0,
+            is_playing=False,
+            ad_duration=10,
+            cycle_len=0,
+        )
+        self._state_lock = threading.Lock()  # Serializes state writers only
         self.locally_paused = False  # Track if paused locally
-        self.start_time = 0  # Local time when current ad sequence started
         self.pause_time = 0  # Elapsed time when paused
-        self.last_time_check = 0  # For checking time drift
+        self.last_time_check = float("-inf")  # For checking time drift (never checked)
         self.time_drift_check_interval = 300  # Check time drift every 5 minutes
         self.needs_full_sync = False  # Flag to indicate we need a full sync (used when resuming from pause)
+        self._last_sync_sig = None  # (is_playing, current_ad_index, ad_duration) of the last handled sync
 
         # Time offset to sync with server (server_time - local_time)
         self.server_time_offset = 0
+        # Wall-clock minus monotonic time, refreshed on every sync. Only used
+        # to relate the server's wall-clock timestamps to our clock
+        self._mono_to_wall_offset = time.time() - time.monotonic()
 
         # Idle state - only communicate with server when needed
         self.idle_mode = False
         self.idle_timeout = (
             idle_timeout  # Seconds before automatically exiting idle mode (0 = never)
         )
-        self.idle_timer = None  # Timer for tracking idle timeout
+        self.idle_timer = None  # Event loop timer handle for the idle timeout
 
         # Create local ads directory if it doesn't exist
         self.local_ads_dir = os.path.join(os.getcwd(), "ads_local")
         os.makedirs(self.local_ads_dir, exist_ok=True)
+        # Ad files requested on this connection and not yet saved, so an ad
+        # list arriving before they finish doesn't request them again
+        self._files_requested = set()
+
+        # Decoded ad images by local path: (PIL image, PhotoImage or None).
+        # The PhotoImage is created lazily on the GUI thread. Each entry is a
+        # screen-sized image, so only the few most recently used are kept
+        # (the current ad and the preloaded next one)
+        self._ad_image_cache = OrderedDict()
+        self._ad_image_cache_lock = threading.Lock()
+        self.image_cache_size = 3
+        # Decodes and scales ad images away from the event loop
+        self._image_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ad-image"
+        )
+
+        # Decodes and writes base64 ad files away from the event loop
+        self._io_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="ad-file-io"
+        )
+
+        # Local file for each ad path, or None while it is not available yet.
+        # Kept up to date as ad lists and files arrive, so displaying an ad
+        # needs no filesystem checks
+        self._ad_resolved = {}
 
         # Setup signal handlers
         signal.signal(signal.SIGINT, self.handle_shutdown)
         signal.signal(signal.SIGTERM, self.handle_shutdown)
 
         # Create lock for thread safety
-        self.lock = threading.Lock()
+        self.lock = allocate_lock()
+
+        # Set while a forced window close is queued on the GUI thread. Has its
+        # own lock - self.lock must never be taken on the GUI thread
+        self._close_pending = False
+        self._close_lock = threading.Lock()
+
+        # Set to request shutdown; the main thread waits on it in start()
+        self._stop_event = threading.Event()
+        self._shutdown_lock = threading.Lock()  # Held once shutdown has begun
+
+        # Event loop - a single thread handles the server socket, the display
+        # timer and periodic maintenance. Other threads hand work to it with
+        # call_soon()/call_later()
+        self._sel = selectors.DefaultSelector()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._sel.register(
+            self._wakeup_recv, selectors.EVENT_READ, self._drain_wakeup
+        )
+        self._calls = deque()  # Callbacks posted from other threads
+        self._timers = []  # Heap of [deadline, seq, callback, args]
+        self._timer_seq = itertools.count()
+        self._timers_lock = threading.Lock()
+        self._connect_timer = None  # Pending (re)connect attempt
+        self._display_timer = None  # Fires at the next ad boundary while playing
+        self._preload_timer = None  # Fires shortly before the next ad boundary
+        self._last_displayed_index = -1
+        self._loop_thread = threading.Thread(
+            target=self.run_event_loop, name="ad-client-loop", daemon=True
+        )
+
+        # Local control commands read by the input thread
+        self._cmd_table = {
+            "p": self.toggle_play_pause,
+            "s": self._do_sync,
+            "i": self._do_status,
+            "k": self._do_close_windows,
+            "w": self._do_window_info,
+            "q": self.shutdown,
+            "?": self._show_help,
+        }
 
         # Create user input thread for local control
         self.input_thread = threading.Thread(target=self.handle_user_input, daemon=True)
@@ -167,51 +390,165 @@ class AdClient:
         self.funk_keyboard_port = None  # Will store the discovered port path
 
     def connect(self):
-        """Connect to the ad server"""
-        while not self.connected and not self.idle_mode:
-            try:
-                print(
-                    f"CLIENT [{self.client_id}]: Connecting to server at {self.server_host}:{self.server_port}..."
-                )
+        """Start connecting to the ad server (runs on the event loop thread)"""
+        if self.connected or self.idle_mode or self._connecting:
+            return
 
-                self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self.socket.connect((self.server_host, self.server_port))
-                self.connected = True
+        print(
+            f"CLIENT [{self.client_id}]: Connecting to server at {self.server_host}:{self.server_port}..."
+        )
 
-                print(f"CLIENT [{self.client_id}]: Connected to server successfully!")
+        # Name lookup and the TCP handshake can block for a long time while the
+        # server is unreachable - do them on a helper thread so the event loop
+        # keeps rotating the cached ads meanwhile
+        self._connecting = True
+        threading.Thread(
+            target=self._open_connection, name="ad-client-connect", daemon=True
+        ).start()
 
-                # Start message handler thread
-                threading.Thread(target=self.message_handler, daemon=True).start()
+    def _open_connection(self):
+        """Resolve and connect to the server (runs on a helper thread)"""
+        try:
+            sock = socket.create_connection(
+                (self.server_host, self.server_port), timeout=self.connect_timeout
+            )
+            sock.settimeout(None)
+            # Requests are small and latency sensitive - don't let Nagle hold
+            # back one while the previous is still unacknowledged
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            self.call_soon(self._connect_failed, e)
+            return
 
-                # Request initial sync
-                self.request_sync()
-                time.sleep(0.5)  # Small delay between requests
+        self.call_soon(self._connection_opened, sock)
 
-                # Request ad list
-                self.request_ad_list()
+    def _connection_opened(self, sock):
+        """Take over a newly connected socket (event loop thread)"""
+        self._connecting = False
+        if self.connected or self.idle_mode or self._stop_event.is_set():
+            # Went idle or shut down while connecting
+            sock.close()
+            return
 
-                # Start time drift check
-                threading.Thread(target=self.periodic_maintenance, daemon=True).start()
+        self.socket = sock
+        self.connected = True
 
-            except (socket.error, ConnectionRefusedError) as e:
-                print(f"CLIENT [{self.client_id}]: Connection failed: {e}")
-                print(
-                    f"CLIENT [{self.client_id}]: Retrying in {self.reconnect_interval} seconds..."
-                )
-                time.sleep(self.reconnect_interval)
-                self.connected = False
+        print(f"CLIENT [{self.client_id}]: Connected to server successfully!")
+
+        # Start every connection with an empty receive buffer
+        self._rxlen = 0
+        self._rxscan = 0
+        self._abort_file_payload()
+
+        # The first sync on every connection takes the full path
+        self._last_sync_sig = None
+        # Answers to requests made on an earlier connection won't arrive
+        self._files_requested.clear()
+
+        # Let the event loop handle incoming messages
+        self._sel.register(self.socket, selectors.EVENT_READ, self.message_handler)
+
+        # Request initial sync and the ad list
+        self.request_sync_and_ad_list()
+
+    def _connect_failed(self, error):
+        """Retry after a failed connection attempt (event loop thread)"""
+        self._connecting = False
+        print(f"CLIENT [{self.client_id}]: Connection failed: {error}")
+        print(
+            f"CLIENT [{self.client_id}]: Retrying in {self.reconnect_interval} seconds..."
+        )
+        self.connected = False
+        self.schedule_connect(self.reconnect_interval)
+
+    def schedule_connect(self, delay=0):
+        """Schedule a connection attempt, replacing any that is already pending"""
+        if self._connect_timer:
+            self.cancel_timer(self._connect_timer)
+        self._connect_timer = self.call_later(delay, self.connect)
 
     def periodic_maintenance(self):
         """Periodically check for time drift and perform maintenance tasks"""
+        if self.connected and not self.idle_mode and self.is_playing:
+            # Only do periodic checks if we're playing and connected
+            self.check_time_drift()
+
+        # Check again in a minute
+        self.call_later(60, self.periodic_maintenance)
+
+    def run_event_loop(self):
+        """Event loop: socket readiness, due timers and calls from other threads"""
         while True:
-            time.sleep(60)  # Check every minute
-            if self.connected and not self.idle_mode and self.is_playing:
-                # Only do periodic checks if we're playing and connected
-                self.check_time_drift()
+            try:
+                with self._timers_lock:
+                    timeout = None
+                    if self._calls:
+                        # Posted from a callback on this thread - no wakeup byte
+                        timeout = 0
+                    elif self._timers:
+                        timeout = max(0, self._timers[0][0] - time.monotonic())
+
+                for key, _ in self._sel.select(timeout):
+                    key.data(key.fileobj)
+
+                self._run_callbacks()
+            except Exception as e:
+                print(f"CLIENT [{self.client_id}]: Error in event loop: {e}")
+                traceback.print_exc()
+
+    def _run_callbacks(self):
+        """Run posted calls and all timers that are due"""
+        while self._calls:
+            callback, args = self._calls.popleft()
+            callback(*args)
+
+        now = time.monotonic()
+        while True:
+            with self._timers_lock:
+                if not self._timers or self._timers[0][0] > now:
+                    break
+                _, _, callback, args = heapq.heappop(self._timers)
+
+            if callback is not None:  # None means cancelled
+                callback(*args)
+
+    def _drain_wakeup(self, sock):
+        """Discard wakeup bytes - the posted calls run after select returns"""
+        try:
+            while sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _wakeup(self):
+        """Wake the event loop if called from another thread"""
+        if threading.current_thread() is not self._loop_thread:
+            try:
+                self._wakeup_send.send(b"\0")
+            except BlockingIOError:
+                # A wakeup is already pending
+                pass
+
+    def call_soon(self, callback, *args):
+        """Run a callback on the event loop thread"""
+        self._calls.append((callback, args))
+        self._wakeup()
+
+    def call_later(self, delay, callback, *args):
+        """Run a callback on the event loop thread after a delay, returns a timer handle"""
+        timer = [time.monotonic() + delay, next(self._timer_seq), callback, args]
+        with self._timers_lock:
+            heapq.heappush(self._timers, timer)
+        self._wakeup()
+        return timer
+
+    def cancel_timer(self, timer):
+        """Cancel a timer returned by call_later"""
+        timer[2] = None
 
     def check_time_drift(self):
         """Check if our local timing has drifted too far from server time"""
-        current_time = time.time()
+        current_time = time.monotonic()
         if (
             current_time - self.last_time_check > self.time_drift_check_interval
             and self.ads
@@ -224,35 +561,88 @@ class AdClient:
             self.needs_full_sync = True
             self.request_sync()
 
-    def message_handler(self):
-        """Handle incoming messages from the server"""
-        buffer = ""
+    def message_handler(self, sock):
+        """Handle incoming data from the server (called when the socket is readable)"""
+        if sock is not self.socket:
+            # Event for a socket that has already been closed
+            return
 
         try:
-            while self.connected and not self.idle_mode:
-                data = self.socket.recv(4096)
-                if not data:
-                    raise ConnectionError("Server disconnected")
+            if self._rxlen == len(self._rxbuf):
+                # A single message does not fit - make room for it
+                self._grow_rx_buffer()
 
-                buffer += data.decode("utf-8")
+            received = sock.recv_into(self._rxview[self._rxlen :])
+            if not received:
+                raise ConnectionError("Server disconnected")
 
-                # Process complete messages (assuming JSON messages delimited by newlines)
-                while "\n" in buffer:
-                    message, buffer = buffer.split("\n", 1)
-                    self.process_message(message)
+            self._rxlen += received
+            self._process_rx_buffer()
 
         except Exception as e:
+            if sock is not self.socket:
+                # We closed the socket ourselves (e.g. entering idle mode)
+                return
+
             print(f"CLIENT [{self.client_id}]: Connection to server lost: {e}")
             self.connected = False
+            self._abort_file_payload()
 
             # Attempt to reconnect only if not in idle mode
             if not self.idle_mode:
-                threading.Thread(target=self.reconnect, daemon=True).start()
+                self.reconnect()
             else:
                 print(
                     f"CLIENT [{self.client_id}]: In idle mode - will reconnect when needed"
                 )
 
+    def _process_rx_buffer(self):
+        """Dispatch all complete (newline-terminated) messages in the receive buffer"""
+        buf = self._rxbuf
+        end = self._rxlen
+        start = 0
+        search_from = self._rxscan
+
+        while True:
+            if self._rx_file is not None:
+                # Raw file bytes follow a file_transfer header
+                start = self._write_file_payload(start, end)
+                if self._rx_file is not None:
+                    # Everything received so far belonged to the file
+                    break
+                search_from = start
+
+            newline = buf.find(b"\n", search_from, end)
+            if newline == -1:
+                break
+            if newline > start:
+                self.process_message(self._rxview[start:newline])
+            start = newline + 1
+            search_from = start
+
+        if start:
+            # Move the incomplete tail to the front of the buffer
+            tail = end - start
+            buf[:tail] = buf[start:end]
+            self._rxlen = tail
+
+            if not tail and len(buf) > RECV_BUFFER_SIZE:
+                # Drop the memory we grew into for an oversized message
+                self._rxview.release()
+                self._rxbuf = bytearray(RECV_BUFFER_SIZE)
+                self._rxview = memoryview(self._rxbuf)
+
+        # Everything received so far has been searched
+        self._rxscan = self._rxlen
+
+    def _grow_rx_buffer(self):
+        """Double the receive buffer, keeping its contents"""
+        grown = bytearray(len(self._rxbuf) * 2)
+        grown[: self._rxlen] = self._rxview[: self._rxlen]
+        self._rxview.release()
+        self._rxbuf = grown
+        self._rxview = memoryview(grown)
+
     def reconnect(self):
         """Attempt to reconnect to the server after a disconnection"""
         if self.idle_mode:
@@ -266,13 +656,19 @@ class AdClient:
         # Close socket if it exists
         self.disconnect_socket()
 
-        time.sleep(self.reconnect_interval)
-        self.connect()
+        self.schedule_connect(self.reconnect_interval)
 
     def disconnect_socket(self):
         """Disconnect the socket cleanly"""
         if self.socket:
             try:
+                # Stop watching the socket in the event loop
+                try:
+                    self._sel.unregister(self.socket)
+                except (KeyError, ValueError):
+                    # Never registered (connection attempt failed)
+                    pass
+
                 # Send a proper EOF by shutting down the socket before closing
                 try:
                     self.socket.shutdown(socket.SHUT_RDWR)
@@ -289,10 +685,10 @@ class AdClient:
                 self.socket = None
                 self.connected = False
 
-    def process_message(self, message_str):
-        """Process a message from the server"""
+    def process_message(self, message_bytes):
+        """Process a message (raw UTF-8 JSON bytes) from the server"""
         try:
-            message = json.loads(message_str)
+            message = json_loads(message_bytes)
             command = message.get("command")
 
             if command == "sync":
@@ -304,14 +700,40 @@ class AdClient:
             else:
                 print(f"CLIENT [{self.client_id}]: Unknown command received: {command}")
 
-        except json.JSONDecodeError:
-            print(f"CLIENT [{self.client_id}]: Invalid message format: {message_str}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            print(
+                f"CLIENT [{self.client_id}]: Invalid message format: {bytes(message_bytes).decode('utf-8', 'replace')}"
+            )
         except Exception as e:
             print(f"CLIENT [{self.client_id}]: Error processing message: {e}")
 
     def handle_sync(self, sync_data):
         """Handle sync data from the server"""
+        # Most syncs just repeat the state we already follow - only refresh the
+        # clock offset for those
+        sync_sig = (
+            sync_data.get("is_playing"),
+            sync_data.get("current_ad_index"),
+            sync_data.get("ad_duration"),
+        )
+        if (
+            sync_sig == self._last_sync_sig
+            and not self.needs_full_sync
+            and not self.locally_paused
+            and not self.idle_mode
+        ):
+            wall_now = time.monotonic() + self._mono_to_wall_offset
+            self.server_time_offset = sync_data.get("server_time", wall_now) - wall_now
+            return
+        self._last_sync_sig = sync_sig
+
+        # Status lines are collected under the lock and printed after release
+        messages = []
+
         with self.lock:
+            # Relate our monotonic clock to the server's wall-clock timestamps
+            self._mono_to_wall_offset = time.time() - time.monotonic()
+
             # Store if we're resuming from pause
             resuming_from_pause = self.locally_paused and not self.is_playing
             came_from_idle = self.idle_mode
@@ -326,48 +748,49 @@ class AdClient:
                 or fresh_connection
                 or self.needs_full_sync
             ):
-                print(
+                messages.append(
                     f"CLIENT [{self.client_id}]: Performing full timing synchronization"
                 )
-                self.force_sync_complete(sync_data)
+                self.force_sync_complete(sync_data, messages)
                 self.needs_full_sync = False
 
                 # If resuming, update play state
                 if resuming_from_pause:
                     self.locally_paused = False
                     self.is_playing = True
-                    print(f"CLIENT [{self.client_id}]: Resuming from pause")
+                    messages.append(f"CLIENT [{self.client_id}]: Resuming from pause")
 
             # Calculate server-client time offset
-            server_time = sync_data.get("server_time", time.time())
-            self.server_time_offset = server_time - time.time()
+            wall_now = time.monotonic() + self._mono_to_wall_offset
+            server_time = sync_data.get("server_time", wall_now)
+            self.server_time_offset = server_time - wall_now
 
             # Only update our play state if we're not locally paused
             server_is_playing = sync_data.get("is_playing", False)
 
+            # Get ad duration from server, publishing both changes at once
             if not self.locally_paused:
-                old_is_playing = self.is_playing
-                self.is_playing = server_is_playing
-
-            # Get ad duration from server
-            self.ad_duration = sync_data.get("ad_duration", 10)
+                self._update_state(
+                    is_playing=server_is_playing,
+                    ad_duration=sync_data.get("ad_duration", 10),
+                )
+            else:
+                self.ad_duration = sync_data.get("ad_duration", 10)
 
-            # Print current status
+            # Current status
+            state = self._state
             ad_info = ""
-            if self.ads and 0 <= self.current_ad_index < len(self.ads):
-                ad_info = f" | Current Ad: {self.ads[self.current_ad_index].get('content', 'Unknown')}"
+            if state.ads and 0 <= state.index < len(state.ads):
+                ad_info = f" | Current Ad: {state.ads[state.index].get('content', 'Unknown')}"
 
-            play_status = "Playing" if self.is_playing else "Paused"
+            play_status = "Playing" if state.is_playing else "Paused"
             local_status = " (Locally paused)" if self.locally_paused else ""
             idle_status = " (Idle mode)" if self.idle_mode else ""
 
             # Calculate local timing info for display
-            if self.is_playing and self.ads:
-                elapsed_time = (time.time() - self.start_time) % (
-                    self.ad_duration * len(self.ads)
-                )
-                current_ad_index = int(elapsed_time / self.ad_duration)
-                remaining_time = self.ad_duration - (elapsed_time % self.ad_duration)
+            if state.is_playing and state.ads:
+                elapsed_time = (time.monotonic() - state.start_time) % state.cycle_len
+                remaining_time = state.ad_duration - (elapsed_time % state.ad_duration)
 
                 timing_info = f" | Remaining: {remaining_time:.1f}s (local timing)"
             else:
@@ -375,59 +798,62 @@ class AdClient:
                 remaining_time = sync_data.get("remaining_time", 0)
                 timing_info = f" | Remaining: {remaining_time:.1f}s (server timing)"
 
-            print(
+            messages.append(
                 f"CLIENT [{self.client_id}]: Sync received: {play_status}{local_status}{idle_status}{ad_info}{timing_info}"
             )
 
-            # If we're playing and don't have a display thread, start one
-            if self.is_playing and not hasattr(self, "display_thread"):
-                self.display_thread = threading.Thread(
-                    target=self.display_loop, daemon=True
-                )
-                self.display_thread.start()
+            # Timing may have changed - re-arm the display timer from the new state
+            if state.is_playing:
+                self._schedule_next_ad()
 
             # If we're coming from idle mode or it's initial sync and we're playing, force display the current ad
-            if (came_from_idle or fresh_connection) and self.is_playing and self.ads:
-                self.force_display_current_ad()
+            force_display = (
+                (came_from_idle or fresh_connection) and state.is_playing and state.ads
+            )
 
             self.initial_sync_done = True
 
             # If we're locally paused, enter idle mode after receiving sync data
-            if self.locally_paused and not self.idle_mode:
-                self.enter_idle_mode(already_locked=True)
+            enter_idle = self.locally_paused and not self.idle_mode
+
+        for message in messages:
+            print(message)
 
-    def force_sync_complete(self, sync_data):
+        if force_display:
+            self.force_display_current_ad()
+
+        if enter_idle:
+            self.enter_idle_mode()
+
+    def force_sync_complete(self, sync_data, messages):
         """Force complete sync with server data, including current ad and timing"""
         # Update current ad index first
         if self.ads:
             self.current_ad_index = sync_data.get("current_ad_index", 0)
 
-        # Calculate exactly when the server calculated the sync data
-        server_timestamp = sync_data.get("timestamp", time.time())
         server_elapsed_time = sync_data.get("elapsed_time", 0)
 
         if self.ads:
-            # Reset timing completely using absolute time values
-            # Account for network delay by estimating round trip time (server_time vs our time)
-            network_delay = time.time() - sync_data.get("server_time", time.time())
-
-            # Calculate our start time based on server elapsed time, adjusted for delay
-            total_cycle_time = self.ad_duration * len(self.ads)
+            # Reset timing completely using the server's elapsed time
+            now = time.monotonic()
+            wall_now = now + self._mono_to_wall_offset
 
-            # First calculate when server started playback
-            server_start_time = server_timestamp - server_elapsed_time
+            # Account for network delay by comparing the server's wall-clock
+            # send time with ours (converted once from our monotonic clock)
+            network_delay = wall_now - sync_data.get("server_time", wall_now)
 
-            # Then adjust that to our local time reference
-            self.start_time = server_start_time - network_delay
+            # The server was server_elapsed_time into the cycle when it sent the
+            # sync, and that was network_delay ago on our clock
+            self.start_time = now - server_elapsed_time - network_delay
 
-            print(
+            messages.append(
                 f"CLIENT [{self.client_id}]: Force synchronized with server (network delay: {network_delay:.3f}s)"
             )
 
             # Log the exact sync details
             current_ad_index = sync_data.get("current_ad_index", 0)
             if 0 <= current_ad_index < len(self.ads):
-                print(
+                messages.append(
                     f"CLIENT [{self.client_id}]: Now showing ad {current_ad_index+1}/{len(self.ads)}: {self.ads[current_ad_index].get('content', 'Unknown')}"
                 )
 
@@ -436,7 +862,7 @@ class AdClient:
         if self.ads and 0 <= self.current_ad_index < len(self.ads):
             ad = self.ads[self.current_ad_index]
             # Display the ad immediately
-            threading.Thread(target=self.display_ad, args=(ad,), daemon=True).start()
+            self.call_soon(self.display_ad, ad)
             print(
                 f"CLIENT [{self.client_id}]: Forced display of current ad: {ad.get('content', 'Unknown')}"
             )
@@ -451,8 +877,7 @@ class AdClient:
         if sync_data.get("is_playing", False):
             # Server is playing, calculate our local start time
             if self.ads:
-                total_cycle_time = self.ad_duration * len(self.ads)
-                self.start_time = time.time() - server_elapsed_time
+                self.start_time = time.monotonic() - server_elapsed_time
                 print(
                     f"CLIENT [{self.client_id}]: Synchronized local timing with server"
                 )
@@ -467,37 +892,102 @@ class AdClient:
         if self.ads:
             self.current_ad_index = sync_data.get("current_ad_index", 0)
 
-    def display_loop(self):
-        """Main loop for displaying ads locally based on local timing"""
-        last_ad_index = -1
+    def _update_state(self, **changes):
+        """Publish a new playback state with the given fields changed"""
+        with self._state_lock:
+            state = self._state._replace(**changes)
+            if "ads" in changes or "ad_duration" in changes:
+                state = state._replace(cycle_len=state.ad_duration * len(state.ads))
+            self._state = state
+
+    def _schedule_next_ad(self, delay=0):
+        """(Re)arm the display timer, replacing any pending one"""
+        if self._display_timer:
+            self.cancel_timer(self._display_timer)
+        if self._preload_timer:
+            self.cancel_timer(self._preload_timer)
+            self._preload_timer = None
+        self._display_timer = self.call_later(delay, self._advance_ad)
+
+    def _cancel_next_ad(self):
+        """Stop the display timer (playback paused)"""
+        if self._display_timer:
+            self.cancel_timer(self._display_timer)
+            self._display_timer = None
+        if self._preload_timer:
+            self.cancel_timer(self._preload_timer)
+            self._preload_timer = None
+
+    def _advance_ad(self):
+        """Display the ad that is current by local timing and wait for the next boundary"""
+        self._display_timer = None
+
+        # One snapshot of the playback state - no lock needed
+        state = self._state
+        if not state.is_playing or not state.ads:
+            # Re-armed by the next sync or ad list
+            return
 
-        while True:
-            time.sleep(0.1)  # Small sleep to prevent CPU hogging
+        # Calculate the current ad index based on locally tracked elapsed time
+        elapsed_time = (time.monotonic() - state.start_time) % state.cycle_len
+        current_ad_index = int(elapsed_time / state.ad_duration)
+
+        # If we've moved to a new ad, display it
+        if current_ad_index != self._last_displayed_index:
+            if 0 <= current_ad_index < len(state.ads):
+                self.current_ad_index = current_ad_index  # Update tracked index
+                self._last_displayed_index = current_ad_index
+                self.display_ad(state.ads[current_ad_index])
+
+        # Sleep until the current ad ends
+        remaining_time = state.ad_duration - (elapsed_time % state.ad_duration)
+        self._schedule_next_ad(remaining_time)
+
+        # Get the next ad's image ready a second before it is due
+        next_index = (current_ad_index + 1) % len(state.ads)
+        if next_index != current_ad_index:
+            self._preload_timer = self.call_later(
+                max(0, remaining_time - 1.0),
+                self._preload_ad,
+                state.ads[next_index],
+            )
 
-            with self.lock:
-                if not self.is_playing or not self.ads:
-                    continue
+    def _preload_ad(self, ad):
+        """Decode an upcoming ad and build its PhotoImage ahead of its boundary"""
+        self._preload_timer = None
 
-                # Calculate the current ad index based on locally tracked elapsed time
-                elapsed_time = (time.time() - self.start_time) % (
-                    self.ad_duration * len(self.ads)
-                )
-                current_ad_index = int(elapsed_time / self.ad_duration)
+        ad_path = ad.get("path", "")
+        local_path = self._ad_resolved.get(ad_path) if ad_path else None
+        if not local_path or not local_path.lower().endswith(
+            (".jpg", ".jpeg", ".png", ".gif", ".bmp")
+        ):
+            return
+
+        cached = self._cached_image(local_path)
+        if cached is not None and cached[1] is not None:
+            return  # Already ready to swap in
+
+        def make_photo(img):
+            # The PhotoImage upload happens here, behind the current ad
+            cached = self._cached_image(local_path)
+            if cached is not None and cached[0] is img and cached[1] is None:
+                self._cache_image(local_path, (img, ImageTk.PhotoImage(img)))
+
+        def load_and_prepare():
+            try:
+                img = self.load_ad_image(local_path)
+                execute_in_gui_thread(lambda: make_photo(img), category="preload")
+            except Exception as e:
+                print(f"CLIENT [{self.client_id}]: Error preloading image: {e}")
 
-                # If we've moved to a new ad, display it
-                if current_ad_index != last_ad_index:
-                    if 0 <= current_ad_index < len(self.ads):
-                        ad = self.ads[current_ad_index]
-                        self.current_ad_index = current_ad_index  # Update tracked index
-                        self.display_ad(ad)
-                        last_ad_index = current_ad_index
+        self._image_pool.submit(load_and_prepare)
 
     def exit_idle_mode(self, already_locked=False):
         """Exit idle mode - reconnect to server for syncing"""
         if self.idle_mode:
             # Cancel any active idle timeout timer
             if self.idle_timer:
-                self.idle_timer.cancel()
+                self.cancel_timer(self.idle_timer)
                 self.idle_timer = None
 
             if already_locked:
@@ -510,7 +1000,7 @@ class AdClient:
 
                 # Reconnect to server
                 if not self.connected:
-                    threading.Thread(target=self.connect, daemon=True).start()
+                    self.schedule_connect()
                     print(
                         f"CLIENT [{self.client_id}]: Reconnecting to server for sync..."
                     )
@@ -525,7 +1015,7 @@ class AdClient:
 
                     # Reconnect to server
                     if not self.connected:
-                        threading.Thread(target=self.connect, daemon=True).start()
+                        self.schedule_connect()
                         print(
                             f"CLIENT [{self.client_id}]: Reconnecting to server for sync..."
                         )
@@ -535,92 +1025,218 @@ class AdClient:
     def handle_ad_list(self, ad_list_data):
         """Handle ad list data from the server"""
         with self.lock:
+            had_ads = bool(self.ads)
             self.ads = ad_list_data.get("ads", [])
             print(
                 f"CLIENT [{self.client_id}]: Received ad list with {len(self.ads)} ads"
             )
 
-            # Request any ad files we don't have locally
+            # A sync handled without ads (e.g. the one sent on connect, ahead of
+            # the list) leaves the timing unset - take the next one in full
+            resync = self.ads and (not had_ads or not self.start_time)
+            if resync:
+                self.needs_full_sync = True
+
+            # A new list changes the cycle, so the next sync must not be skipped
+            self._last_sync_sig = None
+
+            # Forget decoded images of ads that are no longer in the list
+            new_paths = {
+                os.path.join(self.local_ads_dir, ad["path"])
+                for ad in self.ads
+                if ad.get("path")
+            }
+            with self._ad_image_cache_lock:
+                for stale_path in set(self._ad_image_cache) - new_paths:
+                    del self._ad_image_cache[stale_path]
+
+            # Resolve local files once and request any ad files we don't have
+            resolved = {}
+            missing = []
             for ad in self.ads:
                 ad_path = ad.get("path", "")
-                if ad_path and not os.path.exists(
-                    os.path.join(self.local_ads_dir, ad_path)
-                ):
-                    self.request_ad_file(ad_path)
+                if not ad_path:
+                    continue
+                local_path = os.path.join(self.local_ads_dir, ad_path)
+                if os.path.exists(local_path):
+                    resolved[ad_path] = local_path
+                else:
+                    resolved[ad_path] = None
+                    missing.append(ad_path)
+            self._ad_resolved = resolved
+            self.request_ad_files(missing)
+
+            # Ad boundaries depend on the list - re-arm the display timer
+            if self.is_playing:
+                self._schedule_next_ad()
+
+        if resync:
+            self.request_sync()
 
     def handle_file_transfer(self, file_data):
         """Handle file transfer from server"""
         filename = file_data.get("filename", "")
         content_base64 = file_data.get("content", "")
 
+        if filename and "size" in file_data and "content" not in file_data:
+            # Header for a raw payload - the file bytes follow on the socket
+            self._begin_file_payload(filename, int(file_data["size"]))
+            return
+
         if filename and content_base64:
-            import base64
+            # Decoding a multi-MB payload would stall message handling
+            self._io_pool.submit(self._write_ad_file, filename, content_base64)
 
-            try:
-                # Decode the base64 content
-                file_content = base64.b64decode(content_base64)
+    def _write_ad_file(self, filename, content_base64):
+        """Decode and save a base64 ad file (runs on the file I/O pool)"""
+        local_path = os.path.join(self.local_ads_dir, filename)
+        part_path = local_path + ".part"
+        try:
+            # Decode the base64 content
+            file_content = b64decode(content_base64)
+
+            # Save the file to local ads directory
+            with open(part_path, "wb") as f:
+                f.write(file_content)
+            os.replace(part_path, local_path)
+        except Exception as e:
+            print(f"CLIENT [{self.client_id}]: Error saving ad file {filename}: {e}")
+            self.call_soon(self._files_requested.discard, filename)
+            return
 
-                # Save the file to local ads directory
-                local_path = os.path.join(self.local_ads_dir, filename)
-                with open(local_path, "wb") as f:
-                    f.write(file_content)
+        self.call_soon(self._ad_file_saved, filename, local_path)
 
+    def _ad_file_saved(self, filename, local_path):
+        """Make a newly saved ad file available for display"""
+        self._files_requested.discard(filename)
+        # Drop any image decoded from an older copy of the file
+        with self._ad_image_cache_lock:
+            self._ad_image_cache.pop(local_path, None)
+        self._ad_resolved[filename] = local_path
+
+        print(f"CLIENT [{self.client_id}]: Received and saved ad file: {filename}")
+
+    def _begin_file_payload(self, filename, size):
+        """Start receiving a raw file payload of `size` bytes"""
+        local_path = os.path.join(self.local_ads_dir, filename)
+        part_path = local_path + ".part"
+
+        try:
+            f = open(part_path, "wb")
+        except OSError as e:
+            # Still consume the payload so the stream stays in sync
+            print(f"CLIENT [{self.client_id}]: Error saving ad file {filename}: {e}")
+            f = None
+
+        self._rx_file = {
+            "file": f,
+            "filename": filename,
+            "local_path": local_path,
+            "part_path": part_path,
+            "remaining": size,
+        }
+
+        if size == 0:
+            self._finish_file_payload()
+
+    def _write_file_payload(self, start, end):
+        """Write buffered payload bytes to the file, returns the new start offset"""
+        transfer = self._rx_file
+        count = min(transfer["remaining"], end - start)
+
+        if transfer["file"] is not None:
+            try:
+                transfer["file"].write(self._rxview[start : start + count])
+            except OSError as e:
                 print(
-                    f"CLIENT [{self.client_id}]: Received and saved ad file: {filename}"
-                )
-            except Exception as e:
-                print(
-                    f"CLIENT [{self.client_id}]: Error saving ad file {filename}: {e}"
+                    f"CLIENT [{self.client_id}]: Error saving ad file {transfer['filename']}: {e}"
                 )
+                transfer["file"].close()
+                transfer["file"] = None
 
-    def request_sync(self):
-        """Request sync data from the server"""
+        transfer["remaining"] -= count
+        if transfer["remaining"] == 0:
+            self._finish_file_payload()
+
+        return start + count
+
+    def _finish_file_payload(self):
+        """Move a completely received file into place"""
+        transfer = self._rx_file
+        self._rx_file = None
+
+        if transfer["file"] is None:
+            self._files_requested.discard(transfer["filename"])
+            return
+
+        try:
+            transfer["file"].close()
+            # Only complete files ever appear under the ad's name
+            os.replace(transfer["part_path"], transfer["local_path"])
+            self._ad_file_saved(transfer["filename"], transfer["local_path"])
+        except OSError as e:
+            print(
+                f"CLIENT [{self.client_id}]: Error saving ad file {transfer['filename']}: {e}"
+            )
+            self._files_requested.discard(transfer["filename"])
+
+    def _abort_file_payload(self):
+        """Discard a partially received file (connection lost mid-transfer)"""
+        transfer = self._rx_file
+        self._rx_file = None
+
+        if transfer and transfer["file"] is not None:
+            try:
+                transfer["file"].close()
+                os.remove(transfer["part_path"])
+            except OSError:
+                pass
+
+    def _send_request(self, payloads, description):
+        """Send encoded request(s) to the server, reconnecting on failure"""
         if self.connected and not self.idle_mode:
             try:
-                request = {"command": "get_sync", "client_id": self.client_id}
-                self.socket.send((json.dumps(request) + "\n").encode("utf-8"))
-                print(f"CLIENT [{self.client_id}]: Requested sync data from server")
+                send_frames(self.socket, payloads)
+                print(f"CLIENT [{self.client_id}]: Requested {description}")
             except Exception as e:
-                print(f"CLIENT [{self.client_id}]: Error requesting sync: {e}")
+                print(f"CLIENT [{self.client_id}]: Error requesting {description}: {e}")
                 self.connected = False
 
                 # Only reconnect if not in idle mode
                 if not self.idle_mode:
-                    threading.Thread(target=self.reconnect, daemon=True).start()
+                    self.call_soon(self.reconnect)
+
+    def request_sync(self):
+        """Request sync data from the server"""
+        self._send_request([self._req_sync], "sync data from server")
 
     def request_ad_list(self):
         """Request ad list from the server"""
-        if self.connected and not self.idle_mode:
-            try:
-                request = {"command": "get_ads", "client_id": self.client_id}
-                self.socket.send((json.dumps(request) + "\n").encode("utf-8"))
-                print(f"CLIENT [{self.client_id}]: Requested ad list from server")
-            except Exception as e:
-                print(f"CLIENT [{self.client_id}]: Error requesting ad list: {e}")
-                self.connected = False
+        self._send_request([self._req_ads], "ad list from server")
 
-                # Only reconnect if not in idle mode
-                if not self.idle_mode:
-                    threading.Thread(target=self.reconnect, daemon=True).start()
+    def request_sync_and_ad_list(self):
+        """Request sync data and the ad list in one write
 
-    def request_ad_file(self, filename):
-        """Request ad file from the server"""
-        if self.connected and not self.idle_mode:
-            try:
-                request = {
-                    "command": "get_file",
-                    "filename": filename,
-                    "client_id": self.client_id,
-                }
-                self.socket.send((json.dumps(request) + "\n").encode("utf-8"))
-                print(f"CLIENT [{self.client_id}]: Requested ad file: {filename}")
-            except Exception as e:
-                print(f"CLIENT [{self.client_id}]: Error requesting ad file: {e}")
-                self.connected = False
+        The server answers the requests of a connection in order, so there
+        is no need to wait between them.
+        """
+        self._send_request(
+            [self._req_sync, self._req_ads], "sync data and ad list from server"
+        )
 
-                # Only reconnect if not in idle mode
-                if not self.idle_mode:
-                    threading.Thread(target=self.reconnect, daemon=True).start()
+    def request_ad_files(self, filenames):
+        """Request several ad files from the server in one write"""
+        # Skip files already on their way
+        filenames = [name for name in filenames if name not in self._files_requested]
+        self._files_requested.update(filenames)
+        if filenames:
+            self._send_request(
+                [
+                    GET_FILE_REQUEST % (json_dumps(filename), self._client_id_json)
+                    for filename in filenames
+                ],
+                f"ad files: {', '.join(filenames)}",
+            )
 
     def display_ad(self, ad):
         """Display an ad (in this case, just print it and show image if available)"""
@@ -630,9 +1246,9 @@ class AdClient:
         print(f"  Content: {ad.get('content', 'Unknown')}")
 
         ad_path = ad.get("path", "")
-        local_path = os.path.join(self.local_ads_dir, ad_path) if ad_path else ""
+        local_path = self._ad_resolved.get(ad_path) if ad_path else None
 
-        if local_path and os.path.exists(local_path):
+        if local_path:
             print(f"  Image: {local_path}")
             # Display the image in a graphical window if it's an image file
             if local_path.lower().endswith((".jpg", ".jpeg", ".png", ".gif", ".bmp")):
@@ -644,103 +1260,146 @@ class AdClient:
 
         print("-" * 50)
 
-    def show_image_window(self, image_path, title):
-        """Show the image in a tkinter window"""
-        global image_window, image_label, windows
+    def load_ad_image(self, image_path):
+        """Decode an ad image and scale it to the screen (cached per ad)"""
+        cached = self._cached_image(image_path)
+        if cached is not None:
+            return cached[0]
 
-        # Load the image first (outside GUI thread)
-        try:
-            print(f"CLIENT [{self.client_id}]: Loading image: {image_path}")
-            img = Image.open(image_path)
+        print(f"CLIENT [{self.client_id}]: Loading image: {image_path}")
+        img = Image.open(image_path)
+        img.load()
+        print(
+            f"CLIENT [{self.client_id}]: Image loaded: {img.format}, {img.size}, {img.mode}"
+        )
+
+        # Resize if the image is too large
+        max_width, max_height = 3000, 2500
+        width, height = img.size
+        if width > max_width or height > max_height:
+            ratio = min(max_width / width, max_height / height)
+            new_size = (int(width * ratio), int(height * ratio))
+            img = img.resize(new_size, Image.BILINEAR)
+            print(f"CLIENT [{self.client_id}]: Resized image to {new_size}")
+
+        if screen_size:
+            screen_width, screen_height = screen_size
+
+            # Scale image to fit the screen while maintaining aspect ratio
+            img_width, img_height = img.size
+            # Calculate scaling factors for both dimensions
+            width_ratio = screen_width / img_width
+            height_ratio = screen_height / img_height
+
+            # Use the smaller ratio to ensure image fits fully on screen
+            # For fullscreen filling, use the larger ratio
+            scale_ratio = max(width_ratio, height_ratio)
+
+            # Calculate new dimensions
+            new_width = int(img_width * scale_ratio)
+            new_height = int(img_height * scale_ratio)
+
+            # Resize the image to fill the screen
+            img = img.resize((new_width, new_height), Image.BILINEAR)
             print(
-                f"CLIENT [{self.client_id}]: Image loaded: {img.format}, {img.size}, {img.mode}"
+                f"CLIENT [{self.client_id}]: Fullscreen scaled image to {new_width}x{new_height} (screen: {screen_width}x{screen_height})"
             )
 
-            # Resize if the image is too large
-            max_width, max_height = 3000, 2500
-            width, height = img.size
-            if width > max_width or height > max_height:
-                ratio = min(max_width / width, max_height / height)
-                new_size = (int(width * ratio), int(height * ratio))
-                img = img.resize(new_size, Image.LANCZOS)
-                print(f"CLIENT [{self.client_id}]: Resized image to {new_size}")
-
-            # Now create/update the window in the GUI thread
-            def create_or_update_window():
-                global image_window, image_label, windows
-
-                # Create a new window if one doesn't exist
-                if image_window is None or len(windows) == 0:
-                    print(
-                        f"CLIENT [{self.client_id}]: Creating new window for ad display"
-                    )
-                    # Create a new toplevel window
-                    image_window = tk.Toplevel(root)
-                    image_window.attributes("-fullscreen", True)
-                    windows.append(image_window)  # Keep track of all windows
-
-                    image_window.title(f"Ad Display - {self.client_id} - {title}")
-                    image_window.protocol("WM_DELETE_WINDOW", self.close_image_window)
-                    image_window.minsize(320, 240)
-
-                    # Create label for image
-                    image_label = tk.Label(image_window)
-                    image_label.pack(fill=tk.BOTH, expand=True)
+        self._cache_image(image_path, (img, None))
+        return img
+
+    def _cached_image(self, image_path):
+        """Return the cached (PIL image, PhotoImage or None) for a path, or None"""
+        with self._ad_image_cache_lock:
+            cached = self._ad_image_cache.get(image_path)
+            if cached is not None:
+                self._ad_image_cache.move_to_end(image_path)
+            return cached
+
+    def _cache_image(self, image_path, entry):
+        """Cache an image entry, dropping the least recently used beyond the limit"""
+        with self._ad_image_cache_lock:
+            self._ad_image_cache[image_path] = entry
+            self._ad_image_cache.move_to_end(image_path)
+            while len(self._ad_image_cache) > self.image_cache_size:
+                self._ad_image_cache.popitem(last=False)
 
-                    # Bind event handlers to the window and image label
-                    self.bind_window_events(image_window, image_label)
-                else:
-                    # Reuse existing window
-                    print(f"CLIENT [{self.client_id}]: Updating existing window")
-                    image_window.title(f"Ad Display - {self.client_id} - {title}")
+    def show_image_window(self, image_path, title):
+        """Show the image in a tkinter window"""
 
-                    # Ensure event handlers are bound
-                    self.bind_window_events(image_window, image_label)
+        # Create/update the window in the GUI thread
+        def create_or_update_window(img):
+            global image_window, image_label, windows
 
-                # Get screen dimensions for proper scaling
-                screen_width = image_window.winfo_screenwidth()
-                screen_height = image_window.winfo_screenheight()
+            # Create a new window if one doesn't exist
+            if image_window is None or len(windows) == 0:
+                print(
+                    f"CLIENT [{self.client_id}]: Creating new window for ad display"
+                )
+                # Create a new toplevel window
+                image_window = tk.Toplevel(root)
+                image_window.attributes("-fullscreen", True)
+                windows.append(image_window)  # Keep track of all windows
 
-                # Scale image to fit the screen while maintaining aspect ratio
-                img_width, img_height = img.size
-                # Calculate scaling factors for both dimensions
-                width_ratio = screen_width / img_width
-                height_ratio = screen_height / img_height
+                image_window.title(f"Ad Display - {self.client_id} - {title}")
+                image_window.protocol("WM_DELETE_WINDOW", self.close_image_window)
+                image_window.minsize(320, 240)
 
-                # Use the smaller ratio to ensure image fits fully on screen
-                # For fullscreen filling, use the larger ratio
-                scale_ratio = max(width_ratio, height_ratio)
+                # Create label for image
+                image_label = tk.Label(image_window)
+                image_label.pack(fill=tk.BOTH, expand=True)
 
-                # Calculate new dimensions
-                new_width = int(img_width * scale_ratio)
-                new_height = int(img_height * scale_ratio)
+                # Bind event handlers to the window and image label
+                self.bind_window_events(image_window, image_label)
+            else:
+                # Reuse existing window
+                print(f"CLIENT [{self.client_id}]: Updating existing window")
+                image_window.title(f"Ad Display - {self.client_id} - {title}")
 
-                # Resize the image to fill the screen
-                resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-                print(
-                    f"CLIENT [{self.client_id}]: Fullscreen scaled image to {new_width}x{new_height} (screen: {screen_width}x{screen_height})"
-                )
+                # Ensure event handlers are bound
+                self.bind_window_events(image_window, image_label)
 
+            # Reuse the PhotoImage from an earlier display
+            cached = self._cached_image(image_path)
+            if cached is not None and cached[0] is img and cached[1] is not None:
+                tk_img = cached[1]
+            else:
                 # Convert image for display
-                tk_img = ImageTk.PhotoImage(resized_img)
+                tk_img = ImageTk.PhotoImage(img)
+                if cached is not None and cached[0] is img:
+                    self._cache_image(image_path, (img, tk_img))
 
-                # Update the image
-                image_label.configure(image=tk_img)
-                image_label.image = tk_img  # Keep a reference
+            # Update the image
+            image_label.configure(image=tk_img)
+            image_label.image = tk_img  # Keep a reference
 
-                # Make sure window is visible and raised to the top
-                image_window.update()
-                image_window.deiconify()
-                image_window.lift()
+            # Make sure window is visible and raised to the top
+            image_window.update()
+            image_window.deiconify()
+            image_window.lift()
 
-                print(f"CLIENT [{self.client_id}]: Window updated and visible")
+            print(f"CLIENT [{self.client_id}]: Window updated and visible")
 
-            # Execute window creation/update in GUI thread
-            execute_in_gui_thread(create_or_update_window)
+        # Load the image first (outside GUI thread)
+        def load_and_show():
+            try:
+                img = self.load_ad_image(image_path)
+                execute_in_gui_thread(
+                    lambda: create_or_update_window(img), category="show_image"
+                )
+            except Exception as e:
+                print(f"CLIENT [{self.client_id}]: Error displaying image: {e}")
+                traceback.print_exc()
 
-        except Exception as e:
-            print(f"CLIENT [{self.client_id}]: Error displaying image: {e}")
-            traceback.print_exc()
+        cached = self._cached_image(image_path)
+        if cached is not None:
+            execute_in_gui_thread(
+                lambda: create_or_update_window(cached[0]), category="show_image"
+            )
+        else:
+            # Decoding and scaling a large image takes a while - keep it off
+            # the event loop so server messages are still handled meanwhile
+            self._image_pool.submit(load_and_show)
 
     def bind_window_events(self, window, label):
         """Bind key and mouse events to window and label to enter idle mode on interaction"""
@@ -780,11 +1439,8 @@ class AdClient:
                 f"\nCLIENT [{self.client_id}]: {event_type} detected in window - entering idle mode"
             )
 
-            # Schedule the action in a thread to not block the event loop
-            def pause_thread():
-                self.toggle_play_pause()
-
-            threading.Thread(target=pause_thread, daemon=True).start()
+            # Hand the action to the client event loop to not block the Tk loop
+            self.call_soon(self.toggle_play_pause)
 
     def close_image_window(self):
         """Close the main image window if it exists"""
@@ -798,19 +1454,20 @@ class AdClient:
 
         try:
             print(f"CLIENT [{self.client_id}]: Closing all windows...")
-            # Close all tracked windows
-            for win in list(windows):
+            # Take the tracked windows and reset references first, so handlers
+            # run by destroy() never see a half-closed list
+            closing = windows
+            windows = []
+            image_window = None
+            image_label = None
+
+            for win in closing:
                 try:
                     win.destroy()
-                    windows.remove(win)
                     print(f"CLIENT [{self.client_id}]: Destroyed window")
                 except Exception as e:
                     print(f"CLIENT [{self.client_id}]: Error destroying window: {e}")
 
-            # Reset references
-            image_window = None
-            image_label = None
-            windows = []
             print(
                 f"CLIENT [{self.client_id}]: All windows closed and references cleared"
             )
@@ -820,16 +1477,26 @@ class AdClient:
 
     def close_image_window_force(self):
         """Forcibly close all windows - test function"""
-        print(f"CLIENT [{self.client_id}]: Force closing all windows")
-        execute_in_gui_thread(self.close_all_windows_internal)
+        # A queued image update would only reopen the window we are closing
+        with gui_pending_lock:
+            gui_pending.pop("show_image", None)
 
-        # Also send a close command to root for good measure
-        def force_refresh():
-            global root
-            if root:
-                root.update()
+        # Nothing to do if no window is open or a close is already on its way
+        with self._close_lock:
+            if self._close_pending or (not windows and image_window is None):
+                return
+            self._close_pending = True
 
-        execute_in_gui_thread(force_refresh)
+        print(f"CLIENT [{self.client_id}]: Force closing all windows")
+        execute_in_gui_thread(self._close_all_then_clear_flag)
+
+    def _close_all_then_clear_flag(self):
+        """Close all windows and allow the next forced close (GUI thread)"""
+        try:
+            self.close_all_windows_internal()
+        finally:
+            with self._close_lock:
+                self._close_pending = False
 
     def enter_idle_mode(self, already_locked=False):
         """Enter idle mode - disconnect from server to minimize communication"""
@@ -872,7 +1539,7 @@ class AdClient:
         """Set up a timer to automatically exit idle mode after the configured timeout"""
         # Cancel any existing timer
         if self.idle_timer:
-            self.idle_timer.cancel()
+            self.cancel_timer(self.idle_timer)
             self.idle_timer = None
 
         # Only set up a timer if timeout is greater than 0
@@ -880,15 +1547,19 @@ class AdClient:
             print(
                 f"CLIENT [{self.client_id}]: Idle timeout set to {self.idle_timeout} seconds"
             )
-            # Create a new timer
-            self.idle_timer = threading.Timer(
+            # Arm it on the event loop - no thread per timeout
+            self.idle_timer = self.call_later(
                 self.idle_timeout, self.idle_timeout_callback
             )
-            self.idle_timer.daemon = True
-            self.idle_timer.start()
 
     def idle_timeout_callback(self):
-        """Called when the idle timeout is reached"""
+        """Called on the event loop when the idle timeout is reached"""
+        self.idle_timer = None
+
+        # Cancelled from another thread just as it came due
+        if not self.idle_mode:
+            return
+
         print(
             f"CLIENT [{self.client_id}]: Idle timeout reached after {self.idle_timeout} seconds - auto-resuming"
         )
@@ -897,106 +1568,98 @@ class AdClient:
 
     def handle_user_input(self):
         """Handle user input for local control"""
-        print(f"CLIENT [{self.client_id}]: Local Control Available:")
-        print("  p - Toggle Play/Pause locally")
-        print("  s - Force sync with server")
-        print("  i - Show idle/connection status")
-        print("  k - Test close window (debug)")
-        print("  w - Show window info (debug)")
-        print("  q - Quit client")
-        print("  ? - Show this help")
+        self._show_help()
 
-        while True:
+        # "q" ends the loop through shutdown()
+        while not self._stop_event.is_set():
             cmd = input().strip().lower()
 
-            if cmd == "p":
-                self.toggle_play_pause()
-            elif cmd == "s":
-                print(f"CLIENT [{self.client_id}]: Forcing sync with server...")
-
-                # Exit idle mode if needed for sync
-                if self.idle_mode:
-                    self.exit_idle_mode()
-
-                    # Wait a bit for connection to establish
-                    sync_tries = 0
-                    while not self.connected and sync_tries < 10:
-                        sync_tries += 1
-                        time.sleep(0.5)
-
-                if self.connected:
-                    self.request_sync()
-                    time.sleep(0.5)  # Small delay between requests
-                    self.request_ad_list()
-                else:
-                    print(
-                        f"CLIENT [{self.client_id}]: Not connected - try again in a few seconds"
-                    )
-            elif cmd == "k":
-                # Test window closing functionality
-                print(f"CLIENT [{self.client_id}]: Testing window close functionality")
-                self.close_image_window_force()
-            elif cmd == "w":
-                # Print window info
-                global image_window, windows
-                print(f"CLIENT [{self.client_id}]: Window info:")
-                print(f"  Main window exists: {image_window is not None}")
-                print(f"  Number of tracked windows: {len(windows)}")
-                for i, win in enumerate(windows):
-                    try:
-                        print(f"  Window {i}: {win} - exists: {win.winfo_exists()}")
-                    except:
-                        print(f"  Window {i}: {win} - error checking")
-            elif cmd == "i":
-                status = "Connected" if self.connected else "Disconnected"
-                idle = "In idle mode" if self.idle_mode else "Active mode"
-                play = (
-                    "Playing"
-                    if self.is_playing
-                    else "Paused" + (" (locally)" if self.locally_paused else "")
-                )
-                print(f"CLIENT [{self.client_id}]: Status: {status} | {idle} | {play}")
-
-                # Show current ad and timing based on local calculations
-                ad_name, current_index, elapsed, remaining = (
-                    self.calculate_current_status()
-                )
-                if ad_name != "No ads available" and ad_name != "Unknown":
-                    print(
-                        f"  Current Ad: {ad_name} | Index: {current_index} | Remaining: {remaining:.1f}s"
-                    )
-                    print(
-                        f"  Local timing: elapsed={elapsed:.1f}s, start_time={self.start_time}, pause_time={self.pause_time}"
-                    )
-                else:
-                    print(f"  {ad_name}")
-
-            elif cmd == "q":
-                self.shutdown()
-                break
-            elif cmd == "?":
-                print(f"CLIENT [{self.client_id}]: Local Control Commands:")
-                print("  p - Toggle Play/Pause locally")
-                print("  s - Force sync with server")
-                print("  i - Show idle/connection status")
-                print("  k - Test close window (debug)")
-                print("  w - Show window info (debug)")
-                print("  q - Quit client")
-                print("  ? - Show this help")
+            handler = self._cmd_table.get(cmd)
+            if handler:
+                handler()
             else:
                 print(
                     f"CLIENT [{self.client_id}]: Unknown command '{cmd}'. Type ? for help"
                 )
 
+    def _show_help(self):
+        """Print the local control commands"""
+        print(f"CLIENT [{self.client_id}]: Local Control Commands:")
+        print(_HELP_TEXT)
+
+    def _do_sync(self):
+        """Force a sync with the server, leaving idle mode if needed"""
+        if threading.current_thread() is not self._loop_thread:
+            # The connection and its timers are only touched on the event loop
+            self.call_soon(self._do_sync)
+            return
+
+        print(f"CLIENT [{self.client_id}]: Forcing sync with server...")
+
+        # Exit idle mode if needed for sync - the new connection requests the
+        # sync and ad list as soon as it is up
+        if self.idle_mode:
+            self.exit_idle_mode()
+            return
+
+        if self.connected:
+            self.request_sync_and_ad_list()
+        else:
+            print(
+                f"CLIENT [{self.client_id}]: Not connected - try again in a few seconds"
+            )
+
+    def _do_close_windows(self):
+        """Test window closing functionality"""
+        print(f"CLIENT [{self.client_id}]: Testing window close functionality")
+        self.close_image_window_force()
+
+    def _do_window_info(self):
+        """Print window info"""
+        print(f"CLIENT [{self.client_id}]: Window info:")
+        print(f"  Main window exists: {image_window is not None}")
+        print(f"  Number of tracked windows: {len(windows)}")
+        for i, win in enumerate(windows):
+            try:
+                print(f"  Window {i}: {win} - exists: {win.winfo_exists()}")
+            except:
+                print(f"  Window {i}: {win} - error checking")
+
+    def _do_status(self):
+        """Print connection, idle and playback status"""
+        status = "Connected" if self.connected else "Disconnected"
+        idle = "In idle mode" if self.idle_mode else "Active mode"
+        play = (
+            "Playing"
+            if self.is_playing
+            else "Paused" + (" (locally)" if self.locally_paused else "")
+        )
+        print(f"CLIENT [{self.client_id}]: Status: {status} | {idle} | {play}")
+
+        # Show current ad and timing based on local calculations
+        ad_name, current_index, elapsed, remaining = self.calculate_current_status()
+        if ad_name != "No ads available" and ad_name != "Unknown":
+            print(
+                f"  Current Ad: {ad_name} | Index: {current_index} | Remaining: {remaining:.1f}s"
+            )
+            print(
+                f"  Local timing: elapsed={elapsed:.1f}s, start_time={self.start_time}, pause_time={self.pause_time}"
+            )
+        else:
+            print(f"  {ad_name}")
+
     def handle_shutdown(self, signum, frame):
         """Handle shutdown signals"""
         print(f"CLIENT [{self.client_id}]: Shutdown signal received")
         self.close_image_window()  # Close the image window on shutdown
-        self.shutdown()
+        # Wake the main thread, which shuts down on its way out of start()
+        self._stop_event.set()
 
     def shutdown(self):
         """Clean shutdown of the client"""
-        global gui_thread_running, gui_queue
+        # Only the first caller (input thread or main thread) does the work
+        if not self._shutdown_lock.acquire(blocking=False):
+            return
 
         print(f"CLIENT [{self.client_id}]: Shutting down...")
 
@@ -1017,8 +1680,10 @@ class AdClient:
         self.disconnect_socket()
 
         # Shut down GUI thread
-        gui_thread_running = False
-        gui_queue.put(None)  # Signal GUI thread to exit
+        stop_gui_thread()
+
+        # Let the main thread return from start()
+        self._stop_event.set()
 
         # Exit program
         sys.exit(0)
@@ -1026,7 +1691,11 @@ class AdClient:
     def start(self):
         """Start the client"""
         print(f"CLIENT [{self.client_id}]: Starting...")
-        self.connect()
+
+        # Start the event loop and connect from it
+        self._loop_thread.start()
+        self.call_soon(self.connect)
+        self.call_later(60, self.periodic_maintenance)
 
         # Start user input thread for local control
         self.input_thread.start()
@@ -1035,11 +1704,12 @@ class AdClient:
         self.find_funk_keyboard()
         self.setup_serial_keyboard()
 
-        # Keep the main thread alive
+        # Keep the main thread alive until a shutdown is requested
         try:
-            while True:
-                time.sleep(1)
+            self._stop_event.wait()
         except KeyboardInterrupt:
+            pass
+        finally:
             self.shutdown()
 
     def find_funk_keyboard(self):
@@ -1132,7 +1802,7 @@ class AdClient:
 
                         if data:
                             # Print the data in hex format for debugging
-                            hex_data = " ".join([f"{b:02x}" for b in data])
+                            hex_data = data.hex(" ")
                             print(
                                 f"CLIENT [{self.client_id}]: Funk keyboard data detected: {hex_data}"
                             )
@@ -1142,10 +1812,8 @@ class AdClient:
                                 print(
                                     f"CLIENT [{self.client_id}]: Entering idle mode due to funk keyboard activity"
                                 )
-                                # Use a thread to avoid blocking this loop
-                                threading.Thread(
-                                    target=self.toggle_play_pause, daemon=True
-                                ).start()
+                                # Let the event loop handle it to avoid blocking this loop
+                                self.call_soon(self.toggle_play_pause)
 
                                 # Small delay to prevent multiple triggers from the same press
                                 time.sleep(0.5)
@@ -1173,14 +1841,21 @@ class AdClient:
 
     def toggle_play_pause(self):
         """Toggle between play and pause states locally"""
+        if threading.current_thread() is not self._loop_thread:
+            # The display timers are only armed and cancelled on the event loop
+            self.call_soon(self.toggle_play_pause)
+            return
+
         with self.lock:
-            if self.is_playing:
+            state = self._state
+            if state.is_playing:
                 # Pausing locally
-                self.pause_time = (time.time() - self.start_time) % (
-                    self.ad_duration * len(self.ads) if self.ads else self.ad_duration
+                self.pause_time = (time.monotonic() - state.start_time) % (
+                    state.cycle_len or state.ad_duration
                 )
                 self.is_playing = False
                 self.locally_paused = True
+                self._cancel_next_ad()
 
                 print(f"CLIENT [{self.client_id}]: Ad display LOCALLY PAUSED")
 
@@ -1199,40 +1874,28 @@ class AdClient:
 
     def calculate_current_status(self):
         """Calculate current ad status based on local timing"""
-        if not self.ads:
+        state = self._state
+        ads = state.ads
+        if not ads:
             return "No ads available", None, None, None
 
-        if self.is_playing:
+        duration = state.ad_duration
+        if state.is_playing:
             # Calculate based on local timing
-            elapsed_time = (time.time() - self.start_time) % (
-                self.ad_duration * len(self.ads)
-            )
-            current_ad_index = int(elapsed_time / self.ad_duration)
-            remaining_time = self.ad_duration - (elapsed_time % self.ad_duration)
-
-            if 0 <= current_ad_index < len(self.ads):
-                ad = self.ads[current_ad_index]
-                return (
-                    ad.get("content", "Unknown"),
-                    current_ad_index,
-                    elapsed_time,
-                    remaining_time,
-                )
+            elapsed_time = (time.monotonic() - state.start_time) % state.cycle_len
         else:
             # Paused state - use stored pause time
-            if self.ads:
-                elapsed_time = self.pause_time
-                current_ad_index = int(elapsed_time / self.ad_duration)
-                remaining_time = self.ad_duration - (elapsed_time % self.ad_duration)
-
-                if 0 <= current_ad_index < len(self.ads):
-                    ad = self.ads[current_ad_index]
-                    return (
-                        ad.get("content", "Unknown"),
-                        current_ad_index,
-                        elapsed_time,
-                        remaining_time,
-                    )
+            elapsed_time = self.pause_time
+
+        current_ad_index, within_ad = divmod(elapsed_time, duration)
+        current_ad_index = int(current_ad_index)
+        if 0 <= current_ad_index < len(ads):
+            return (
+                ads[current_ad_index].get("content", "Unknown"),
+                current_ad_index,
+                elapsed_time,
+                duration - within_ad,
+            )
 
         return "Unknown", 0, 0, 0
 
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 import serial
+from serial.tools import list_ports
 import time
 import sys
 import os
-import binascii
+import selectors
 
 # ANSI colors for better visibility
 GREEN = "\033[92m"
@@ -11,15 +12,45 @@ YELLOW = "\033[93m"
 CYAN = "\033[96m"
 RESET = "\033[0m"
 
+# Maps printable ASCII bytes to themselves and everything else to "."
+_ASCII_TABLE = bytes(b if 32 <= b <= 126 else ord(".") for b in range(256))
 
-def monitor_serial_port(port_name, baud_rate=9600, timeout=0.1):
+# Line printed after each received chunk
+SEPARATOR = "-" * 60
+
+# Most bytes taken from the port descriptor per read
+READ_CHUNK_SIZE = 65536
+
+
+def read_serial_chunk(ser, sel, timeout):
+    """Wait for serial data and return it, or b"" if nothing arrived in time."""
+    if sel is None:
+        # No selectable descriptor (e.g. Windows) - block in pyserial instead,
+        # then take whatever else is already buffered
+        data = ser.read(1)
+        waiting = ser.in_waiting if data else 0
+        return data + ser.read(waiting) if waiting else data
+
+    if not sel.select(timeout):
+        return b""
+    try:
+        data = os.read(ser.fileno(), READ_CHUNK_SIZE)
+    except BlockingIOError:
+        return b""
+    if not data:
+        # Readable but empty means the device went away
+        raise serial.SerialException("device disconnected")
+    return data
+
+
+def monitor_serial_port(port_name, baud_rate=9600, timeout=1.0):
     """
     Monitor a serial port and display all incoming data in both hex and ASCII.
 
     Args:
         port_name: Serial port device name (e.g., /dev/ttyUSB0)
         baud_rate: Baud rate to use for the connection
-        timeout: Read timeout in seconds
+        timeout: Read timeout in seconds (how often Ctrl+C is noticed while idle)
     """
     print(f"{CYAN}Serial Port Monitor{RESET}")
     print(f"Monitoring port: {GREEN}{port_name}{RESET}")
@@ -35,51 +66,54 @@ def monitor_serial_port(port_name, baud_rate=9600, timeout=0.1):
         # Clear any initial data
         ser.flushInput()
 
+        # Wait for data on the port's descriptor where the OS allows it;
+        # pyserial is then only used to open and configure the port
+        sel = selectors.DefaultSelector()
+        try:
+            sel.register(ser.fileno(), selectors.EVENT_READ)
+        except (AttributeError, OSError, ValueError):
+            sel.close()
+            sel = None
+
         # Counter for received data chunks
         counter = 0
 
         try:
             while True:
-                # Read data if available
-                if ser.in_waiting > 0:
-                    # Read all available data
-                    data = ser.read(ser.in_waiting)
-
-                    if data:
-                        counter += 1
-                        timestamp = time.strftime("%H:%M:%S", time.localtime())
-
-                        # Convert data to different representations
-                        hex_data = binascii.hexlify(data).decode()
-
-                        # Try to show ASCII representation where possible
-                        ascii_repr = ""
-                        for byte in data:
-                            if 32 <= byte <= 126:  # Printable ASCII
-                                ascii_repr += chr(byte)
-                            else:
-                                ascii_repr += "."
-
-                        # Display the received data
-                        print(
-                            f"\n{YELLOW}[{timestamp}] Received data #{counter}:{RESET}"
-                        )
-                        print(f"{CYAN}HEX:{RESET} {hex_data}")
-                        print(f"{CYAN}ASCII:{RESET} {ascii_repr}")
-                        print(
-                            f"{CYAN}Bytes:{RESET} {' '.join([f'{b:02x}' for b in data])}"
-                        )
-                        print(f"{CYAN}Length:{RESET} {len(data)} bytes")
-                        print("-" * 60)
-
-                # Small delay to prevent 100% CPU usage
-                time.sleep(0.05)
+                data = read_serial_chunk(ser, sel, timeout)
+                if not data:
+                    continue
+
+                counter += 1
+                timestamp = time.strftime("%H:%M:%S", time.localtime())
+
+                # Convert data to different representations in one pass each
+                spaced_hex = data.hex(" ")
+                hex_data = data.hex()
+                ascii_repr = data.translate(_ASCII_TABLE).decode("ascii")
+
+                # Display the received data with a single write per chunk
+                sys.stdout.write(
+                    f"\n{YELLOW}[{timestamp}] Received data #{counter}:{RESET}\n"
+                    f"{CYAN}HEX:{RESET} {hex_data}\n"
+                    f"{CYAN}ASCII:{RESET} {ascii_repr}\n"
+                    f"{CYAN}Bytes:{RESET} {spaced_hex}\n"
+                    f"{CYAN}Length:{RESET} {len(data)} bytes\n"
+                    f"{SEPARATOR}\n"
+                )
+                sys.stdout.flush()
 
         except KeyboardInterrupt:
             print(f"\n{YELLOW}Monitoring stopped by user{RESET}")
 
+        except (serial.SerialException, OSError) as e:
+            # Unplugged mid-session - os.read fails with EIO or returns nothing
+            print(f"\n{YELLOW}Serial port {port_name} disconnected: {e}{RESET}")
+
         finally:
             # Always close the serial port
+            if sel is not None:
+                sel.close()
             ser.close()
             print(f"Closed port {port_name}")
 
@@ -87,27 +121,32 @@ def monitor_serial_port(port_name, baud_rate=9600, timeout=0.1):
         print(f"{YELLOW}Error opening serial port {port_name}: {e}{RESET}")
 
 
-def find_serial_ports():
-    """Find potential serial ports on the system."""
-    potential_ports = []
+def _port_sort_key(port):
+    """Order USB-serial adapters (ttyUSB) first, other USB ports next, UARTs last."""
+    if "ttyUSB" in port.device:
+        rank = 0
+    elif "ttyACM" in port.device or port.vid is not None:
+        rank = 1
+    else:
+        # Built-in ports such as ttyS0 or the Pi's ttyAMA0
+        rank = 2
 
-    # Common paths for serial ports on Linux
-    if sys.platform.startswith("linux"):
-        # Look for ttyUSB devices (USB to serial adapters like PL2303)
-        for i in range(10):
-            port = f"/dev/ttyUSB{i}"
-            if os.path.exists(port):
-                potential_ports.append(port)
+    # Number-aware, so ttyUSB2 comes before ttyUSB10
+    name = port.device.rstrip("0123456789")
+    number = port.device[len(name) :]
+    return rank, name, int(number) if number else -1
 
-        # Look for ttyS devices (hardware serial ports)
-        for i in range(10):
-            port = f"/dev/ttyS{i}"
-            if os.path.exists(port):
-                potential_ports.append(port)
 
-    # macOS and Windows would need different patterns, but we're focusing on Linux
+def list_serial_ports():
+    """List the serial ports the OS knows about, most likely keyboard first."""
+    # comports() enumerates the ports (USB adapters such as the PL2303, CDC-ACM
+    # devices and hardware ports) on every platform, but in no particular order
+    return sorted(list_ports.comports(), key=_port_sort_key)
 
-    return potential_ports
+
+def find_serial_ports():
+    """Find potential serial ports on the system."""
+    return [port.device for port in list_serial_ports()]
 
 
 if __name__ == "__main__":
@@ -121,8 +160,8 @@ if __name__ == "__main__":
     parser.add_argument(
         "--timeout",
         type=float,
-        default=0.1,
-        help="Read timeout in seconds (default: 0.1)",
+        default=1.0,
+        help="Read timeout in seconds (default: 1.0)",
     )
     parser.add_argument(
         "--scan", action="store_true", help="Scan and list available serial ports"
@@ -131,11 +170,11 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     if args.scan:
-        ports = find_serial_ports()
+        ports = list_serial_ports()
         if ports:
             print(f"{CYAN}Found serial ports:{RESET}")
             for port in ports:
-                print(f"  {GREEN}{port}{RESET}")
+                print(f"  {GREEN}{port.device}{RESET} - {port.description}")
         else:
             print(f"{YELLOW}No serial ports found.{RESET}")
         sys.exit(0)
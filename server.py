@@ -1,31 +1,141 @@
 #!/usr/bin/env python3
 import socket
+import selectors
 import threading
+import heapq
+import itertools
 import time
 import json
+import base64
 import signal
 import sys
 import os
-import base64
+import queue
+import logging
+import logging.handlers
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import shutil
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
+
+# Conditionally import watchdog - fall back to polling the ads directory
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    print("watchdog not installed. Ads directory will be polled for changes.")
+
+# Use orjson for all JSON if available - it encodes straight to bytes.
+# The helpers take and return bytes either way
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+
+    def json_dumps_indented(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+except ImportError:
+
+    def json_loads(data):
+        return json.loads(data)
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def json_dumps_indented(obj):
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+
+# Most queued messages written to a client socket with one sendmsg call
+SEND_BUFFERS_MAX = 64
+
+# The sync message is sent on every connect and state change and has a fixed
+# shape, so it's filled in from a template instead of going through JSON
+SYNC_FMT = (
+    b'{"command":"sync","timestamp":%r,"server_time":%r,"is_playing":%s,'
+    b'"current_ad_index":%d,"remaining_time":%r,"ad_duration":%r,'
+    b'"elapsed_time":%r,"start_time":%s,"pause_time":%s}\n'
+)
+
+# Server messages are queued and written to the console by a listener thread,
+# so the event loop never waits on stdout. Per-message traffic is logged at
+# DEBUG level and is dropped cheaply unless enabled (CLI "debug" command).
+logger = logging.getLogger("adserver")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+log_queue = queue.Queue(-1)
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener = logging.handlers.QueueListener(
+    log_queue, logging.StreamHandler(sys.stdout)
+)
+log_listener.start()
+
+
+if WATCHDOG_AVAILABLE:
+
+    class AdsDirectoryHandler(FileSystemEventHandler):
+        """Queue file appearances, removals and renames in the ads directory"""
+
+        def __init__(self, events):
+            super().__init__()
+            self.events = events
+
+        def is_relevant(self, path):
+            # The server writes these itself
+            name = os.path.basename(path)
+            return name != "ad_list.json" and not name.endswith(".tmp")
+
+        def on_created(self, event):
+            if not event.is_directory and self.is_relevant(event.src_path):
+                self.events.put(event)
+
+        def on_deleted(self, event):
+            if not event.is_directory and self.is_relevant(event.src_path):
+                self.events.put(event)
+
+        def on_moved(self, event):
+            if not event.is_directory and (
+                self.is_relevant(event.src_path) or self.is_relevant(event.dest_path)
+            ):
+                self.events.put(event)
 
 
 class AdServer:
-    def __init__(self, host="0.0.0.0", port=5000):
+    def __init__(self, host="0.0.0.0", port=5000, poll_ads_dir=False):
         self.host = host
         self.port = port
-        self.clients = []  # List of client sockets
-        self.client_info = {}  # Dictionary to store client info by socket
+        # Locks, by what they guard. When more than one is needed, take them
+        # in this order: ads_lock, clients_lock, playback_lock
+        self.ads_lock = threading.Lock()  # ads, ad_list_bytes
+        self.clients_lock = threading.Lock()  # client_info and its entries
+        self.playback_lock = threading.Lock()  # play/pause state and timing
+
+        # Connected clients: info by socket, including the connection's receive
+        # buffer and pending output. The dict is replaced as a whole when a
+        # client joins or leaves (copy-on-write), so broadcasts iterate a
+        # snapshot without any lock
+        self.client_info = {}
         self.ads = []
+        self.ad_list_bytes = None  # Encoded ad_list message, None when stale
+        self.saved_ads_bytes = None  # Contents of ad_list.json as last read/written
+        self.dir_fingerprint = None  # Ad files seen by the last scan
         self.current_ad_index = 0
         self.ad_duration = 10  # seconds per ad
         self.start_time = time.time()
         self.is_playing = True
         self.pause_time = 0
-        self.lock = threading.Lock()
+
+        # Blank placeholder image and font, copied/reused for each added ad
+        self.placeholder_template = Image.new("RGB", (640, 480), color=(240, 240, 240))
+        self.placeholder_font = ImageFont.load_default()
 
         # Setup main ads directory (will be watched for changes)
         self.ads_dir = os.path.join(os.getcwd(), "ads")
@@ -34,6 +144,21 @@ class AdServer:
         # Setup ad file watcher
         self.last_check_time = time.time()
         self.file_check_interval = 5  # seconds
+        self.dir_change_debounce = 0.2  # seconds of quiet before rescanning
+        self.maintenance_interval = 30  # seconds between stale client checks
+        self.dir_events = None  # Filesystem events, when watchdog is available
+        # Recently sent ad files kept in memory: filename -> (mtime_ns, size, bytes).
+        # Only touched from the event loop thread; files are read on file_pool.
+        self.file_cache = OrderedDict()
+        self.file_cache_bytes = 0
+        self.file_cache_limit = 64 * 1024 * 1024
+        self.file_cache_loading = set()
+        self.file_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="ad-file-read"
+        )
+        self.observer = None
+        if WATCHDOG_AVAILABLE:
+            self.start_directory_observer(poll_ads_dir)
 
         # Load ads from file
         self.load_ads()
@@ -42,6 +167,19 @@ class AdServer:
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
 
+        # Event loop - one thread serves all client sockets (epoll/kqueue).
+        # Other threads queue output and hand calls to it with call_soon()
+        self.sel = selectors.DefaultSelector()
+        self.loop_thread = None  # Set once the loop runs
+        self.calls = deque()
+        self.timers = []  # Heap of [deadline (time.monotonic()), seq, callback, args]
+        self.timer_seq = itertools.count()
+        self.timers_lock = threading.Lock()
+        self.wakeup_recv, self.wakeup_send = socket.socketpair()
+        self.wakeup_recv.setblocking(False)
+        self.wakeup_send.setblocking(False)
+        self.sel.register(self.wakeup_recv, selectors.EVENT_READ, self.drain_wakeup)
+
         # Register signal handlers
         signal.signal(signal.SIGINT, self.handle_shutdown)
         signal.signal(signal.SIGTERM, self.handle_shutdown)
@@ -52,9 +190,12 @@ class AdServer:
     def load_ads(self):
         """Load the ad list from the file or create a default one"""
         try:
-            with open(os.path.join(self.ads_dir, "ad_list.json"), "r") as f:
-                self.ads = json.load(f)
-            print(f"SERVER: Loaded {len(self.ads)} ads")
+            with open(os.path.join(self.ads_dir, "ad_list.json"), "rb") as f:
+                data = f.read()
+            self.ads = json_loads(data)
+            self.saved_ads_bytes = data
+            self.ad_list_bytes = None
+            logger.info(f"SERVER: Loaded {len(self.ads)} ads")
         except FileNotFoundError:
             # Scan the ads directory for images and create a default list
             self.scan_ads_directory()
@@ -68,34 +209,46 @@ class AdServer:
                 ]
 
             self.save_ads()
-            print(f"SERVER: Created ad list with {len(self.ads)} ads")
+            logger.info(f"SERVER: Created ad list with {len(self.ads)} ads")
 
     def scan_ads_directory(self):
         """Scan the ads directory for image files and update the ad list"""
-        image_extensions = [".jpg", ".jpeg", ".png", ".gif", ".bmp"]
-
-        # List all files in the ads directory
-        files = [
-            f
-            for f in os.listdir(self.ads_dir)
-            if os.path.isfile(os.path.join(self.ads_dir, f))
-            and any(f.lower().endswith(ext) for ext in image_extensions)
-            and f != "ad_list.json"  # Exclude the ad_list.json file itself
-        ]
-
-        with self.lock:
-            # Get current paths in our ad list
-            current_paths = {ad["path"]: ad["id"] for ad in self.ads}
+        image_extensions = (".jpg", ".jpeg", ".png", ".gif", ".bmp")
+
+        # List all files in the ads directory - scandir entries answer is_file()
+        # from the directory listing, without another stat per file
+        with os.scandir(self.ads_dir) as entries:
+            files = [
+                entry.name
+                for entry in entries
+                if entry.name.lower().endswith(image_extensions)
+                and entry.name != "ad_list.json"  # Exclude the ad_list.json file itself
+                and entry.is_file()
+            ]
+
+        # Same files as at the last scan that changed nothing - nothing to do
+        fingerprint = frozenset(files)
+        if fingerprint == self.dir_fingerprint:
+            return False
+
+        with self.ads_lock:
+            # Get current ads by path (first one wins), and the IDs in use
+            current_ads = {}
+            for ad in self.ads:
+                current_ads.setdefault(ad["path"], ad)
+            used_ids = {ad["id"] for ad in self.ads}
 
             # Recreate the ad list from scratch based on files in the directory
             new_ads = []
+            new_paths = set()
             next_id = 1
 
             # Keep track of existing ads to preserve their IDs and content
             for file in files:
-                if file in current_paths:
+                new_paths.add(file)
+                existing_ad = current_ads.get(file)
+                if existing_ad is not None:
                     # Keep existing ad entries but ensure they're updated
-                    existing_ad = next(ad for ad in self.ads if ad["path"] == file)
                     new_ads.append(existing_ad)
                 else:
                     # Create a new entry for this file
@@ -104,189 +257,458 @@ class AdServer:
                     content = base_name.replace("_", " ").title()
 
                     # Find an available ID
-                    while any(ad["id"] == next_id for ad in new_ads):
+                    while next_id in used_ids:
                         next_id += 1
+                    used_ids.add(next_id)
 
                     new_ads.append({"id": next_id, "content": content, "path": file})
                     next_id += 1
-                    print(f"SERVER: Added new ad from file: {file}")
+                    logger.info(f"SERVER: Added new ad from file: {file}")
 
             # Check if there were any changes
-            if len(new_ads) != len(self.ads) or set(
-                ad["path"] for ad in new_ads
-            ) != set(ad["path"] for ad in self.ads):
+            if len(new_ads) != len(self.ads) or new_paths != current_ads.keys():
                 # Update the ads list
                 self.ads = new_ads
-                print(f"SERVER: Updated ad list, now contains {len(self.ads)} ads")
+                logger.info(
+                    f"SERVER: Updated ad list, now contains {len(self.ads)} ads"
+                )
 
                 # Sort ads by ID for consistency
                 self.ads.sort(key=lambda ad: ad["id"])
 
                 # Save the updated list
                 self.save_ads()
+                self.dir_fingerprint = fingerprint
                 return True  # Indicate changes were made
 
+            self.dir_fingerprint = fingerprint
             return False  # No changes were made
 
+    def start_directory_observer(self, poll_ads_dir):
+        """Have the OS report changes in the ads directory (inotify, FSEvents, ...)"""
+        self.dir_events = queue.Queue()
+        handler = AdsDirectoryHandler(self.dir_events)
+
+        if not poll_ads_dir:
+            try:
+                self.observer = Observer()
+                self.observer.schedule(handler, self.ads_dir)
+                self.observer.start()
+                return
+            except OSError as e:
+                # e.g. out of inotify watches
+                logger.error(
+                    f"SERVER ERROR: Cannot watch ads directory, polling instead: {e}"
+                )
+
+        # Network mounts (NFS/CIFS) don't deliver change events
+        self.observer = PollingObserver(timeout=self.file_check_interval)
+        self.observer.schedule(handler, self.ads_dir)
+        self.observer.start()
+
     def watch_ads_directory(self):
         """Watch the ads directory for changes and update the ad list accordingly"""
+        if self.dir_events is None:
+            self.poll_ads_directory()
+            return
+
+        while True:
+            # Sleep until something in the directory changes
+            self.dir_events.get()
+
+            # Copying a batch of images produces a burst of events - wait for
+            # it to settle and handle the whole burst with one scan
+            while True:
+                try:
+                    self.dir_events.get(timeout=self.dir_change_debounce)
+                except queue.Empty:
+                    break
+
+            logger.info("SERVER: Change in ads directory, rescanning...")
+            self.rescan_and_notify()
+
+    def poll_ads_directory(self):
+        """Rescan the ads directory periodically (without watchdog)"""
         while True:
             time.sleep(self.file_check_interval)
 
             current_time = time.time()
             if current_time - self.last_check_time >= self.file_check_interval:
                 # Check for changes by scanning the directory
-                print("SERVER: Checking for changes in ads directory...")
-                changes_made = self.scan_ads_directory()
+                logger.debug("SERVER: Checking for changes in ads directory...")
+                self.rescan_and_notify()
 
-                # If changes were detected (scan_ads_directory returns True if changes were made)
-                if changes_made:
-                    print(
-                        "SERVER: Changes detected in ads directory, notifying clients..."
-                    )
+                self.last_check_time = current_time
 
-                    # Notify all clients about the updated ad list
-                    for client in self.clients:
-                        try:
-                            self.send_ad_list(client)
-                        except:
-                            pass
+    def rescan_and_notify(self):
+        """Scan the ads directory and send the new ad list if it changed"""
+        changes_made = self.scan_ads_directory()
 
-                self.last_check_time = current_time
+        # If changes were detected (scan_ads_directory returns True if changes were made)
+        if changes_made:
+            logger.info(
+                "SERVER: Changes detected in ads directory, notifying clients..."
+            )
+
+            # Notify all clients about the updated ad list
+            for client in self.client_info:
+                try:
+                    self.send_ad_list(client)
+                except:
+                    pass
 
     def save_ads(self):
         """Save the ad list to the file"""
-        with open(os.path.join(self.ads_dir, "ad_list.json"), "w") as f:
-            json.dump(self.ads, f, indent=2)
+        # Every change to the ad list is saved - re-encode it on next send,
+        # and have the next directory scan check the list against the files
+        self.ad_list_bytes = None
+        self.dir_fingerprint = None
+
+        data = json_dumps_indented(self.ads)
+        if data == self.saved_ads_bytes:
+            return  # File already has this content
+
+        # Write a temporary file and swap it in, so a crash can't leave a
+        # half-written ad list (the directory watcher ignores *.tmp files)
+        path = os.path.join(self.ads_dir, "ad_list.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.saved_ads_bytes = data
 
     def start(self):
         """Start the server"""
         try:
             self.server_socket.bind((self.host, self.port))
             self.server_socket.listen(10)
-            print(f"SERVER: Started on {self.host}:{self.port}")
-            print(f"SERVER: Monitoring ads directory: {self.ads_dir}")
+            logger.info(f"SERVER: Started on {self.host}:{self.port}")
+            logger.info(f"SERVER: Monitoring ads directory: {self.ads_dir}")
 
-            # Start a background thread to perform periodic maintenance (cleanup stale clients)
-            threading.Thread(target=self.maintenance_thread, daemon=True).start()
+            # Perform periodic maintenance (cleanup stale clients) on the event loop
+            self.call_later(self.maintenance_interval, self.run_maintenance)
 
-            # Accept clients
-            self.accept_clients()
+            # Accept and serve clients
+            self.server_socket.setblocking(False)
+            self.sel.register(
+                self.server_socket, selectors.EVENT_READ, self.accept_client
+            )
+            self.run_event_loop()
         except Exception as e:
-            print(f"SERVER ERROR: {e}")
+            logger.error(f"SERVER ERROR: {e}")
             self.shutdown()
 
-    def accept_clients(self):
-        """Accept incoming client connections"""
+    def run_event_loop(self):
+        """Event loop: client connections, socket readiness and posted calls"""
+        self.loop_thread = threading.current_thread()
         while True:
             try:
-                client_socket, address = self.server_socket.accept()
-                print(f"SERVER: Client connected from {address}")
-
-                # Create a thread to handle this client
-                client_thread = threading.Thread(
-                    target=self.handle_client,
-                    args=(client_socket, address),
-                    daemon=True,
-                )
-                client_thread.start()
+                with self.timers_lock:
+                    timeout = None
+                    if self.timers:
+                        timeout = max(0, self.timers[0][0] - time.monotonic())
+
+                for key, mask in self.sel.select(timeout):
+                    key.data(key.fileobj, mask)
+
+                while self.calls:
+                    callback, args = self.calls.popleft()
+                    callback(*args)
+
+                self.run_due_timers()
             except Exception as e:
-                print(f"SERVER ERROR: Error accepting client: {e}")
-                break
+                logger.error(f"SERVER ERROR: Error in event loop: {e}")
+
+    def run_due_timers(self):
+        """Run all timers that are due"""
+        now = time.monotonic()
+        while True:
+            with self.timers_lock:
+                if not self.timers or self.timers[0][0] > now:
+                    break
+                _, _, callback, args = heapq.heappop(self.timers)
+
+            if callback is not None:  # None means cancelled
+                callback(*args)
+
+    def call_later(self, delay, callback, *args):
+        """Run a callback on the event loop thread after a delay, returns a timer handle"""
+        timer = [time.monotonic() + delay, next(self.timer_seq), callback, args]
+        with self.timers_lock:
+            heapq.heappush(self.timers, timer)
+        if not self.in_loop_thread():
+            self.call_soon(lambda: None)  # Wake the loop to pick up the deadline
+        return timer
+
+    def cancel_timer(self, timer):
+        """Cancel a timer returned by call_later"""
+        timer[2] = None
+
+    def in_loop_thread(self):
+        """True on the event loop thread (or before the loop has started)"""
+        return (
+            self.loop_thread is None or threading.current_thread() is self.loop_thread
+        )
+
+    def call_soon(self, callback, *args):
+        """Run a callback on the event loop thread"""
+        self.calls.append((callback, args))
+        if not self.in_loop_thread():
+            try:
+                self.wakeup_send.send(b"\0")
+            except BlockingIOError:
+                # A wakeup is already pending
+                pass
 
-    def handle_client(self, client_socket, address):
-        """Handle communication with a connected client"""
-        client_id = "unknown"
+    def drain_wakeup(self, sock, mask):
+        """Discard wakeup bytes - the posted calls run after select returns"""
         try:
-            # Register client
-            with self.lock:
-                # Set socket timeout to help detect disconnected clients
-                client_socket.settimeout(15)  # 15 seconds timeout
-
-                self.clients.append(client_socket)
-                # Initialize client info with address
-                self.client_info[client_socket] = {
-                    "address": address,
-                    "client_id": None,
-                    "last_active": time.time(),
-                }
-
-            # Send initial sync data
-            self.send_sync_data(client_socket)
-
-            # Send ad list
-            self.send_ad_list(client_socket)
-
-            # Handle client messages
-            buffer = ""
-            while True:
-                try:
-                    data = client_socket.recv(1024)
-                    if not data:
-                        # Client disconnected properly
-                        break
+            while sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
 
-                    # Update last active time
-                    if client_socket in self.client_info:
-                        self.client_info[client_socket]["last_active"] = time.time()
+    def accept_client(self, server_socket, mask):
+        """Accept an incoming client connection"""
+        try:
+            client_socket, address = server_socket.accept()
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.error(f"SERVER ERROR: Error accepting client: {e}")
+            return
+
+        logger.info(f"SERVER: Client connected from {address}")
+        client_socket.setblocking(False)
+        # Let the kernel detect vanished peers, and don't hold back small messages
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Register client
+        info = {
+            "address": address,
+            "client_id": None,
+            "last_active": time.time(),
+            "buffer": bytearray(),  # Received data not yet split into messages
+            "out": deque(),  # Pending output, written as the socket allows
+            "out_offset": 0,  # Bytes of out[0] already sent
+            "events": selectors.EVENT_READ,
+        }
+        with self.clients_lock:
+            self.client_info = {**self.client_info, client_socket: info}
+        self.sel.register(client_socket, selectors.EVENT_READ, self.service_client)
+
+        # Send initial sync data
+        self.send_sync_data(client_socket)
+
+        # Send ad list
+        self.send_ad_list(client_socket)
+
+    def service_client(self, client_socket, mask):
+        """Handle readiness of a client socket"""
+        info = self.client_info.get(client_socket)
+        if info is None:
+            return
+
+        if mask & selectors.EVENT_WRITE:
+            self.flush_output(client_socket)
+        if mask & selectors.EVENT_READ:
+            self.read_client(client_socket, info)
+
+    def read_client(self, client_socket, info):
+        """Read everything the client has sent and process complete messages"""
+        address = info["address"]
+        try:
+            while True:
+                data = client_socket.recv(65536)
+                if not data:
+                    # Client disconnected properly
+                    self.cleanup_client(client_socket, address, info["client_id"])
+                    return
+
+                # Update last active time
+                info["last_active"] = time.time()
+
+                # Append data to buffer
+                info["buffer"] += data
+        except BlockingIOError:
+            # Everything received so far has been read
+            pass
+        except (ConnectionResetError, ConnectionAbortedError):
+            # Client disconnected abruptly
+            self.cleanup_client(client_socket, address, info["client_id"])
+            return
+        except Exception as e:
+            logger.error(
+                f"SERVER ERROR: Error handling client {info['client_id']} ({address}): {e}"
+            )
+            self.cleanup_client(client_socket, address, info["client_id"])
+            return
 
-                    # Append data to buffer
-                    buffer += data.decode("utf-8")
+        # Process all complete messages in buffer, then drop them all at once
+        buffer = info["buffer"]
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            if end > start:  # Skip empty messages
+                self.process_client_message(buffer[start:end], client_socket)
+            start = end + 1
+        del buffer[:start]
+
+    def queue_output(self, client_socket, *items):
+        """Queue output for a client - written by the event loop as the socket allows
+
+        Items are bytes, or a file to stream: {"file": f, "offset": 0, "size": n}.
+        Called from another thread, the items are handed to the event loop and
+        dropped there if the client has left.
+        """
+        if not self.in_loop_thread():
+            # Only the event loop touches a client's output queue
+            self.call_soon(self.queue_posted_output, client_socket, items)
+            return
+
+        info = self.client_info.get(client_socket)
+        if info is None:
+            for item in items:
+                if type(item) is dict:
+                    item["file"].close()
+            raise ConnectionError("client is not connected")
+
+        info["out"].extend(items)
+        self.flush_output(client_socket)
+
+    def queue_posted_output(self, client_socket, items):
+        """Queue output handed over by queue_output from another thread"""
+        try:
+            self.queue_output(client_socket, *items)
+        except ConnectionError:
+            pass  # Client left before the output got to the event loop
 
-                    # Process all complete messages in buffer
-                    while "\n" in buffer:
-                        message, buffer = buffer.split("\n", 1)
-                        if message:  # Skip empty messages
-                            self.process_client_message(message, client_socket)
-                            client_id = self.client_info.get(client_socket, {}).get(
-                                "client_id", "unknown"
-                            )
+    def flush_output(self, client_socket):
+        """Write pending output until done or the socket buffer is full (event loop)"""
+        info = self.client_info.get(client_socket)
+        if info is None:
+            return
 
-                except socket.timeout:
-                    # Check if client is still connected
-                    try:
-                        # Try sending an empty message to check connection
-                        client_socket.send(b"")
-                    except:
-                        # Socket error, client probably disconnected
-                        break
+        out = info["out"]
+        try:
+            while out:
+                head = out[0]
+                if type(head) is dict:
+                    # A file being streamed
+                    head["offset"] += self.send_file_part(client_socket, head)
+                    if head["offset"] >= head["size"]:
+                        out.popleft()
+                        head["file"].close()
                     continue
-                except ConnectionResetError:
-                    # Client disconnected abruptly
-                    break
-                except ConnectionAbortedError:
-                    # Connection aborted
-                    break
 
-        except Exception as e:
-            client_id = self.client_info.get(client_socket, {}).get(
-                "client_id", "unknown"
+                # Hand all queued messages up to the next file to the kernel in
+                # one call (e.g. sync + ad list, or a file header + cached file).
+                # They're taken off the queue first, not iterated in place
+                offset = info["out_offset"]
+                items = [out.popleft()]
+                while out and len(items) < SEND_BUFFERS_MAX:
+                    if type(out[0]) is dict:
+                        break
+                    items.append(out.popleft())
+                buffers = [memoryview(items[0])[offset:]] + items[1:]
+                try:
+                    if len(buffers) > 1 and hasattr(client_socket, "sendmsg"):
+                        sent = client_socket.sendmsg(buffers)
+                    else:
+                        sent = client_socket.send(buffers[0])
+                except OSError:
+                    out.extendleft(reversed(items))
+                    raise
+
+                # Requeue what wasn't fully written, remember how far into it
+                sent += offset
+                written = 0
+                while written < len(items) and sent >= len(items[written]):
+                    sent -= len(items[written])
+                    written += 1
+                out.extendleft(reversed(items[written:]))
+                info["out_offset"] = sent
+                if written < len(items):
+                    break  # Partial write - the socket buffer is full
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            logger.error(
+                f"SERVER ERROR: Error sending to client {info['client_id']}: {e}"
             )
-            print(f"SERVER ERROR: Error handling client {client_id} ({address}): {e}")
-        finally:
-            # Unregister client
-            self.cleanup_client(client_socket, address, client_id)
+            # Not from inside whatever queued this output
+            self.call_soon(
+                self.cleanup_client, client_socket, info["address"], info["client_id"]
+            )
+            return
+
+        # Only wait for writability while there is something left to write
+        events = selectors.EVENT_READ
+        if out:
+            events |= selectors.EVENT_WRITE
+        if events != info["events"]:
+            info["events"] = events
+            self.sel.modify(client_socket, events, self.service_client)
+
+    def send_file_part(self, client_socket, item):
+        """Send as much of a queued file as the socket takes, returns the bytes sent"""
+        count = item["size"] - item["offset"]
+        if hasattr(os, "sendfile"):
+            # Kernel copies file pages to the socket - no userspace buffers
+            sent = os.sendfile(
+                client_socket.fileno(), item["file"].fileno(), item["offset"], count
+            )
+        else:
+            item["file"].seek(item["offset"])
+            sent = client_socket.send(item["file"].read(min(count, 65536)))
+
+        if sent == 0:
+            # The client expects exactly size bytes - can't continue the stream
+            raise OSError(f"file shrank while sending ({item['offset']}/{item['size']})")
+        return sent
 
     def cleanup_client(self, client_socket, address, client_id):
         """Clean up client resources when disconnected"""
-        with self.lock:
-            if client_socket in self.clients:
-                self.clients.remove(client_socket)
+        if not self.in_loop_thread():
+            # The socket is registered with the event loop's selector
+            self.call_soon(self.cleanup_client, client_socket, address, client_id)
+            return
+
+        with self.clients_lock:
+            info = self.client_info.get(client_socket)
+            if info is None:
+                return  # Already cleaned up
+            client_info = self.client_info.copy()
+            del client_info[client_socket]
+            self.client_info = client_info
+        client_id = info.get("client_id", "unknown")
+
+        # Files that were still being streamed
+        for item in info["out"]:
+            if type(item) is dict:
+                item["file"].close()
 
-            # Get client info before removing
-            if client_socket in self.client_info:
-                client_id = self.client_info[client_socket].get("client_id", "unknown")
-                del self.client_info[client_socket]
+        try:
+            self.sel.unregister(client_socket)
+        except (KeyError, ValueError):
+            pass
 
         try:
             client_socket.close()
         except:
             pass
 
-        print(f"SERVER: Client {client_id} ({address}) disconnected")
+        logger.info(f"SERVER: Client {client_id} ({address}) disconnected")
 
     def process_client_message(self, message, client_socket):
-        """Process messages from clients"""
+        """Process a message (bytes, without the newline) from a client"""
         # Update client info for logging
         client_info = self.client_info.get(
             client_socket, {"address": "unknown", "client_id": "unknown"}
@@ -299,7 +721,7 @@ class AdServer:
             self.client_info[client_socket]["last_active"] = time.time()
 
         try:
-            cmd = json.loads(message)
+            cmd = json_loads(message)
             command = cmd.get("command")
 
             # Extract client_id from message if available
@@ -310,56 +732,93 @@ class AdServer:
 
             # Process commands
             if command == "get_sync":
-                print(
-                    f"SERVER: Received 'get_sync' request from client {client_id} ({address})"
+                logger.debug(
+                    "SERVER: Received 'get_sync' request from client %s (%s)",
+                    client_id,
+                    address,
                 )
                 self.send_sync_data(client_socket)
             elif command == "get_ads":
-                print(
-                    f"SERVER: Received 'get_ads' request from client {client_id} ({address})"
+                logger.debug(
+                    "SERVER: Received 'get_ads' request from client %s (%s)",
+                    client_id,
+                    address,
                 )
                 self.send_ad_list(client_socket)
             elif command == "get_file":
                 filename = cmd.get("filename")
                 if filename:
-                    print(
-                        f"SERVER: Received 'get_file' request for '{filename}' from client {client_id} ({address})"
+                    logger.debug(
+                        "SERVER: Received 'get_file' request for '%s' from client %s (%s)",
+                        filename,
+                        client_id,
+                        address,
                     )
-                    self.send_ad_file(client_socket, filename)
+                    # Only clients that ask for it can take the raw payload
+                    self.send_ad_file(client_socket, filename, cmd.get("raw") is True)
             else:
-                print(
+                logger.warning(
                     f"SERVER WARNING: Unknown command '{command}' received from client {client_id} ({address})"
                 )
-        except json.JSONDecodeError:
-            print(
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            message = message.decode("utf-8", "replace")
+            logger.error(
                 f"SERVER ERROR: Invalid message format from client {client_id} ({address}): {message}"
             )
         except Exception as e:
-            print(
+            message = message.decode("utf-8", "replace")
+            logger.error(
                 f"SERVER ERROR: Error processing client message: {e} - Message: {message} from {client_id} ({address})"
             )
 
-    def send_ad_file(self, client_socket, filename):
-        """Send an ad file to a client"""
+    def send_ad_file(self, client_socket, filename, raw=False):
+        """Send an ad file to a client, as raw bytes or base64 (older clients)"""
         file_path = os.path.join(self.ads_dir, filename)
 
         if os.path.exists(file_path) and os.path.isfile(file_path):
             try:
-                # Read the file content
-                with open(file_path, "rb") as f:
-                    file_content = f.read()
-
-                # Encode file content to base64
-                content_base64 = base64.b64encode(file_content).decode("utf-8")
-
-                # Send the file data
-                file_data = {
-                    "command": "file_transfer",
-                    "filename": filename,
-                    "content": content_base64,
-                }
-
-                client_socket.send((json.dumps(file_data) + "\n").encode("utf-8"))
+                f = open(file_path, "rb")
+                try:
+                    st = os.fstat(f.fileno())
+                    size = st.st_size
+
+                    content = self.cached_file(filename, st)
+                    was_cached = content is not None
+                    if not raw:
+                        # Older clients take the file base64-encoded in the message
+                        if content is None:
+                            content = f.read()
+                        f.close()
+                        file_data = {
+                            "command": "file_transfer",
+                            "filename": filename,
+                            "content": base64.b64encode(content).decode("ascii"),
+                        }
+                        self.queue_output(client_socket, json_dumps(file_data) + b"\n")
+                    else:
+                        # A header line, followed by the raw file bytes - from
+                        # the cache if this version of the file was sent
+                        # recently, otherwise streamed straight from the file
+                        file_data = {
+                            "command": "file_transfer",
+                            "filename": filename,
+                            "size": size,
+                        }
+                        header = json_dumps(file_data) + b"\n"
+                        if was_cached:
+                            f.close()
+                            self.queue_output(client_socket, header, content)
+                        else:
+                            self.queue_output(
+                                client_socket,
+                                header,
+                                {"file": f, "offset": 0, "size": size},
+                            )
+                    if not was_cached:
+                        self.warm_file_cache(filename, file_path, st)
+                except:
+                    f.close()
+                    raise
 
                 # Get client info for logging
                 client_info = self.client_info.get(
@@ -367,99 +826,177 @@ class AdServer:
                 )
                 client_id = client_info.get("client_id", "unknown")
 
-                print(f"SERVER: Sent file '{filename}' to client {client_id}")
+                logger.debug("SERVER: Sent file '%s' to client %s", filename, client_id)
 
             except Exception as e:
-                print(f"SERVER ERROR: Error sending file {filename}: {e}")
+                logger.error(f"SERVER ERROR: Error sending file {filename}: {e}")
         else:
-            print(f"SERVER ERROR: File not found: {filename}")
+            logger.error(f"SERVER ERROR: File not found: {filename}")
+
+    def cached_file(self, filename, st):
+        """Return the cached bytes of a file if they match its current stat"""
+        entry = self.file_cache.get(filename)
+        if entry is None:
+            return None
+        if entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+            self.evict_cached_file(filename)
+            return None
+        self.file_cache.move_to_end(filename)
+        return entry[2]
+
+    def evict_cached_file(self, filename):
+        """Drop a file from the cache"""
+        entry = self.file_cache.pop(filename, None)
+        if entry is not None:
+            self.file_cache_bytes -= entry[1]
+
+    def warm_file_cache(self, filename, file_path, st):
+        """Read a file into the cache in the background"""
+        # Files that would take up a large part of the cache are always streamed
+        if st.st_size > self.file_cache_limit // 4:
+            return
+        if filename in self.file_cache_loading:
+            return
+        self.file_cache_loading.add(filename)
+
+        def read_file():
+            try:
+                with open(file_path, "rb") as f:
+                    content = f.read()
+            except OSError:
+                content = None
+            self.call_soon(self.store_cached_file, filename, st, content)
 
-    def send_sync_data(self, client_socket):
-        """Send synchronization data to a client"""
-        with self.lock:
-            # Calculate elapsed time for ad display
+        try:
+            self.file_pool.submit(read_file)
+        except RuntimeError:  # Pool already shut down
+            self.file_cache_loading.discard(filename)
+
+    def store_cached_file(self, filename, st, content):
+        """Add a file read by warm_file_cache to the cache (event loop thread)"""
+        self.file_cache_loading.discard(filename)
+        if content is None or len(content) != st.st_size:
+            return  # Unreadable, or changed while being read
+
+        self.evict_cached_file(filename)
+        self.file_cache[filename] = (st.st_mtime_ns, st.st_size, content)
+        self.file_cache_bytes += st.st_size
+
+        # Evict least recently sent files to stay within the limit
+        while self.file_cache_bytes > self.file_cache_limit:
+            self.evict_cached_file(next(iter(self.file_cache)))
+
+    def encode_sync_data(self):
+        """Build the sync message, returns (bytes, current_ad_index, remaining_time)
+
+        Nothing in it depends on the client, so a broadcast encodes it once.
+        """
+        # Copy the state out and do the arithmetic without the lock
+        with self.playback_lock:
+            is_playing = self.is_playing
+            start_time = self.start_time
+            pause_time = self.pause_time
+            ad_duration = self.ad_duration
+            ads_len = len(self.ads)
+
+        now = time.time()
+        cycle = ad_duration * ads_len
+
+        # Calculate elapsed time for ad display, current ad index and remaining time
+        if ads_len:
+            elapsed_time = ((now - start_time) if is_playing else pause_time) % cycle
+            current_ad_index, within_ad = divmod(elapsed_time, ad_duration)
+            current_ad_index = int(current_ad_index)
+            remaining_time = ad_duration - within_ad
+        else:
             elapsed_time = 0
-            if self.is_playing and self.ads:
-                elapsed_time = (time.time() - self.start_time) % (
-                    self.ad_duration * len(self.ads)
-                )
-            elif not self.is_playing and self.ads:
-                elapsed_time = self.pause_time % (self.ad_duration * len(self.ads))
+            current_ad_index = 0
+            remaining_time = 0
 
-            # Calculate current ad index and remaining time
-            current_ad_index = int(elapsed_time / self.ad_duration) if self.ads else 0
-            remaining_time = (
-                self.ad_duration - (elapsed_time % self.ad_duration) if self.ads else 0
-            )
+        # Only numbers go into the template - %r gives the shortest exact repr,
+        # the same as a JSON encoder would write
+        if is_playing:
+            playing, start, pause = b"true", b"%r" % start_time, b"null"
+        else:
+            playing, start, pause = b"false", b"null", b"%r" % pause_time
+        message = SYNC_FMT % (
+            now,
+            now,
+            playing,
+            current_ad_index,
+            remaining_time,
+            ad_duration,
+            elapsed_time,
+            start,
+            pause,
+        )
+        return message, current_ad_index, remaining_time
 
-            sync_data = {
-                "command": "sync",
-                "timestamp": time.time(),
-                "server_time": time.time(),
-                "is_playing": self.is_playing,
-                "current_ad_index": current_ad_index,
-                "remaining_time": remaining_time,
-                "ad_duration": self.ad_duration,
-                "elapsed_time": elapsed_time,
-                "start_time": self.start_time if self.is_playing else None,
-                "pause_time": self.pause_time if not self.is_playing else None,
-            }
+    def send_sync_data(self, client_socket, sync=None):
+        """Send synchronization data to a client (sync: from encode_sync_data)"""
+        if sync is None:
+            sync = self.encode_sync_data()
+        message, current_ad_index, remaining_time = sync
 
-            try:
-                client_socket.send((json.dumps(sync_data) + "\n").encode("utf-8"))
+        try:
+            self.queue_output(client_socket, message)
 
-                # Get client info for logging
-                client_info = self.client_info.get(
-                    client_socket, {"address": "unknown", "client_id": "unknown"}
-                )
-                client_id = client_info.get("client_id", "unknown")
+            # Get client info for logging
+            client_info = self.client_info.get(
+                client_socket, {"address": "unknown", "client_id": "unknown"}
+            )
+            client_id = client_info.get("client_id", "unknown")
 
-                print(
-                    f"SERVER: Sent sync data to client {client_id} (current_ad: {current_ad_index}, remaining: {remaining_time:.1f}s)"
-                )
+            logger.debug(
+                "SERVER: Sent sync data to client %s (current_ad: %s, remaining: %.1fs)",
+                client_id,
+                current_ad_index,
+                remaining_time,
+            )
 
-            except Exception as e:
-                print(f"SERVER ERROR: Error sending sync data: {e}")
+        except Exception as e:
+            logger.error(f"SERVER ERROR: Error sending sync data: {e}")
 
     def send_ad_list(self, client_socket):
         """Send the ad list to a client"""
-        with self.lock:
-            ad_list_data = {"command": "ad_list", "ads": self.ads}
+        with self.ads_lock:
+            # Encode once and send the same bytes to every client
+            if self.ad_list_bytes is None:
+                ad_list_data = {"command": "ad_list", "ads": self.ads}
+                self.ad_list_bytes = json_dumps(ad_list_data) + b"\n"
+            ad_list_bytes = self.ad_list_bytes
+            ad_count = len(self.ads)
 
-            try:
-                client_socket.send((json.dumps(ad_list_data) + "\n").encode("utf-8"))
+        try:
+            self.queue_output(client_socket, ad_list_bytes)
 
-                # Get client info for logging
-                client_info = self.client_info.get(
-                    client_socket, {"address": "unknown", "client_id": "unknown"}
-                )
-                client_id = client_info.get("client_id", "unknown")
+            # Get client info for logging
+            client_info = self.client_info.get(
+                client_socket, {"address": "unknown", "client_id": "unknown"}
+            )
+            client_id = client_info.get("client_id", "unknown")
 
-                print(
-                    f"SERVER: Sent ad list with {len(self.ads)} ads to client {client_id}"
-                )
+            logger.debug(
+                "SERVER: Sent ad list with %d ads to client %s", ad_count, client_id
+            )
 
-            except Exception as e:
-                print(f"SERVER ERROR: Error sending ad list: {e}")
+        except Exception as e:
+            logger.error(f"SERVER ERROR: Error sending ad list: {e}")
 
     def notify_clients_state_change(self):
         """Notify all connected clients of a state change (play/pause)"""
-        with self.lock:
-            clients_copy = self.clients.copy()
+        # The same bytes go to every client
+        sync = self.encode_sync_data()
 
-        for client_socket in clients_copy:
+        for client_socket, info in self.client_info.items():
             try:
-                self.send_sync_data(client_socket)
+                self.send_sync_data(client_socket, sync)
             except Exception as e:
                 # Client may have disconnected
                 try:
-                    address = self.client_info.get(client_socket, {}).get(
-                        "address", "unknown"
-                    )
-                    client_id = self.client_info.get(client_socket, {}).get(
-                        "client_id", "unknown"
-                    )
-                    print(f"SERVER: Failed to notify client {client_id}: {e}")
+                    address = info.get("address", "unknown")
+                    client_id = info.get("client_id", "unknown")
+                    logger.info(f"SERVER: Failed to notify client {client_id}: {e}")
                     # Remove disconnected client
                     self.cleanup_client(client_socket, address, client_id)
                 except:
@@ -467,14 +1004,14 @@ class AdServer:
 
     def toggle_play_pause(self):
         """Toggle between play and pause states"""
-        with self.lock:
+        with self.playback_lock:
             if self.is_playing and self.ads:
                 # Pausing
                 self.pause_time = (time.time() - self.start_time) % (
                     self.ad_duration * len(self.ads)
                 )
                 self.is_playing = False
-                print(
+                logger.info(
                     f"SERVER: Ad display paused at {datetime.now().strftime('%H:%M:%S')}"
                 )
             else:
@@ -484,7 +1021,7 @@ class AdServer:
                 else:
                     self.start_time = time.time()
                 self.is_playing = True
-                print(
+                logger.info(
                     f"SERVER: Ad display resumed at {datetime.now().strftime('%H:%M:%S')}"
                 )
 
@@ -493,7 +1030,7 @@ class AdServer:
 
     def add_ad(self, ad_data):
         """Add a new ad to the list"""
-        with self.lock:
+        with self.ads_lock:
             new_id = max([ad["id"] for ad in self.ads], default=0) + 1
             ad_data["id"] = new_id
 
@@ -514,28 +1051,31 @@ class AdServer:
                     placeholder_path = os.path.join(self.ads_dir, ad_data["path"])
 
                     # Create a simple colored image with text
-                    img = Image.new("RGB", (640, 480), color=(240, 240, 240))
+                    img = self.placeholder_template.copy()
                     d = ImageDraw.Draw(img)
                     d.text(
                         (320, 240),
                         ad_data.get("content", f"Ad {new_id}"),
                         fill=(0, 0, 0),
+                        font=self.placeholder_font,
                     )
-                    img.save(placeholder_path)
+                    img.save(placeholder_path, quality=70, optimize=False)
 
-                    print(f"SERVER: Created placeholder image: {placeholder_path}")
+                    logger.info(
+                        f"SERVER: Created placeholder image: {placeholder_path}"
+                    )
                 except ImportError:
                     # Fallback if PIL is not available
                     placeholder_path = os.path.join(self.ads_dir, ad_data["path"])
                     with open(placeholder_path, "w") as f:
                         f.write(f"Ad {new_id}: {ad_data.get('content', 'No content')}")
-                    print(f"SERVER: Created placeholder file: {placeholder_path}")
+                    logger.info(f"SERVER: Created placeholder file: {placeholder_path}")
 
             self.ads.append(ad_data)
             self.save_ads()
 
         # Notify clients of the updated ad list
-        for client in self.clients:
+        for client in self.client_info:
             try:
                 self.send_ad_list(client)
             except:
@@ -543,7 +1083,7 @@ class AdServer:
 
     def remove_ad(self, ad_id):
         """Remove an ad from the list"""
-        with self.lock:
+        with self.ads_lock:
             # Find the ad to be removed
             ad_to_remove = None
             for ad in self.ads:
@@ -567,16 +1107,18 @@ class AdServer:
                     if not other_ads_with_same_file and os.path.exists(file_path):
                         try:
                             os.remove(file_path)
-                            print(f"SERVER: Removed ad file: {path}")
+                            logger.info(f"SERVER: Removed ad file: {path}")
                         except:
-                            print(f"SERVER ERROR: Failed to remove ad file: {path}")
+                            logger.error(
+                                f"SERVER ERROR: Failed to remove ad file: {path}"
+                            )
 
             # Update the ads list
             self.ads = [ad for ad in self.ads if ad["id"] != ad_id]
             self.save_ads()
 
         # Notify clients of the updated ad list
-        for client in self.clients:
+        for client in self.client_info:
             try:
                 self.send_ad_list(client)
             except:
@@ -595,30 +1137,40 @@ class AdServer:
             elif sys.platform == "win32":  # Windows
                 subprocess.Popen(["explorer", self.ads_dir])
 
-            print(f"SERVER: Opened ads directory: {self.ads_dir}")
+            logger.info(f"SERVER: Opened ads directory: {self.ads_dir}")
         except Exception as e:
-            print(f"SERVER ERROR: Failed to open ads directory: {e}")
+            logger.error(f"SERVER ERROR: Failed to open ads directory: {e}")
 
     def handle_shutdown(self, signum, frame):
         """Handle shutdown signals"""
-        print("SERVER: Shutdown signal received")
+        logger.info("SERVER: Shutdown signal received")
         self.shutdown()
 
     def shutdown(self):
         """Clean shutdown of the server"""
-        print("SERVER: Shutting down...")
+        if not self.in_loop_thread():
+            # Let the event loop close the sockets it serves and exit
+            self.call_soon(self.shutdown)
+            return
+
+        logger.info("SERVER: Shutting down...")
+
+        # Stop watching the ads directory
+        if self.observer:
+            self.observer.stop()
+        self.file_pool.shutdown(wait=False)
 
         # Save state if needed
         self.save_ads()
 
         # Close all client connections
-        with self.lock:
-            for client in self.clients:
-                try:
-                    client.close()
-                except:
-                    pass
-            self.clients = []
+        with self.clients_lock:
+            clients, self.client_info = self.client_info, {}
+        for client in clients:
+            try:
+                client.close()
+            except:
+                pass
 
         # Close server socket
         try:
@@ -626,46 +1178,64 @@ class AdServer:
         except:
             pass
 
+        # Write out any queued log messages
+        log_listener.stop()
+
         sys.exit(0)
 
-    def maintenance_thread(self):
-        """Periodically check for stale client connections"""
-        while True:
-            time.sleep(30)  # Run every 30 seconds
+    def run_maintenance(self):
+        """Periodically check for stale client connections (event loop timer)"""
+        try:
             self.check_stale_clients()
+        finally:
+            self.call_later(self.maintenance_interval, self.run_maintenance)
 
     def check_stale_clients(self):
         """Check for and remove stale client connections"""
         current_time = time.time()
         stale_clients = []
 
-        with self.lock:
-            # Find stale clients (inactive for more than 60 seconds)
-            for client_socket, info in list(self.client_info.items()):
-                last_active = info.get("last_active", 0)
-                if current_time - last_active > 60:  # 60 seconds threshold
-                    stale_clients.append((client_socket, info))
+        # Find stale clients (inactive for more than 60 seconds)
+        for client_socket, info in self.client_info.items():
+            last_active = info.get("last_active", 0)
+            if current_time - last_active > 60:  # 60 seconds threshold
+                stale_clients.append((client_socket, info))
 
-        # Clean up each stale client
+        # Idle clients (e.g. paused) are silent, so only drop the ones whose
+        # keepalive probes have failed
         for client_socket, info in stale_clients:
             try:
-                # Try to see if the socket is still connected
-                try:
-                    client_socket.send(b"")
-                except:
-                    # Socket is no longer valid, clean it up
-                    address = info.get("address", "unknown")
-                    client_id = info.get("client_id", "unknown")
-                    print(
-                        f"SERVER: Removing stale client {client_id} ({address}) - no response"
-                    )
-                    self.cleanup_client(client_socket, address, client_id)
-            except:
+                error = client_socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            except OSError:
+                error = -1
+            if not error:
+                continue
+            address = info.get("address", "unknown")
+            client_id = info.get("client_id", "unknown")
+            logger.info(
+                f"SERVER: Removing stale client {client_id} ({address}) - no response"
+            )
+            try:
+                client_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
                 pass
+            self.cleanup_client(client_socket, address, client_id)
 
 
 if __name__ == "__main__":
-    server = AdServer()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ad Display Server")
+    parser.add_argument(
+        "--poll-ads-dir",
+        action="store_true",
+        help="Poll the ads directory instead of relying on OS change notifications "
+        "(for network mounts such as NFS/CIFS)",
+    )
+
+    args = parser.parse_args()
+
+    server = AdServer(poll_ads_dir=args.poll_ads_dir)
 
     # Command line interface thread
     def cli():
@@ -679,6 +1249,7 @@ if __name__ == "__main__":
         print("  scan       - Scan the ads directory for new files")
         print("  duration [seconds] - Set the duration for each ad")
         print("  clients    - Show connected clients")
+        print("  debug      - Toggle logging of every client request")
         print("  help       - Show this help")
         print("  exit       - Shutdown the server")
 
@@ -725,7 +1296,7 @@ if __name__ == "__main__":
                 except ValueError:
                     print("Invalid duration value")
             elif cmd == "clients":
-                print(f"Connected clients ({len(server.clients)}):")
+                print(f"Connected clients ({len(server.client_info)}):")
                 for client_socket, info in server.client_info.items():
                     client_id = info.get("client_id", "unknown")
                     address = info.get("address", "unknown")
@@ -734,6 +1305,13 @@ if __name__ == "__main__":
                     print(
                         f"  Client: {client_id}, Address: {address}, Last active: {time_since:.1f}s ago"
                     )
+            elif cmd == "debug":
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.setLevel(logging.INFO)
+                    print("Client request logging off")
+                else:
+                    logger.setLevel(logging.DEBUG)
+                    print("Client request logging on")
             elif cmd == "help":
                 print("Commands:")
                 print("  play/pause - Toggle between playing and pausing ad display")
@@ -744,6 +1322,7 @@ if __name__ == "__main__":
                 print("  scan       - Scan the ads directory for new files")
                 print("  duration [seconds] - Set the duration for each ad")
                 print("  clients    - Show connected clients")
+                print("  debug      - Toggle logging of every client request")
                 print("  help       - Show this help")
                 print("  exit       - Shutdown the server")
             elif cmd == "exit":